@@ -1,11 +1,24 @@
+import time
+import uuid
 import streamlit as st
-from config.settings import APP_NAME, APP_ICON, PAGE_LAYOUT
-from utils.helpers import load_css, format_date
-from services.news_fetcher import fetch_news, get_available_categories
-from services.gemini_summarizer import summarize_text
-from services.text_to_speech import text_to_audio
-from services.translator import translate_to_hindi
+from streamlit.errors import StreamlitAPIException
+from config import settings
+from config.settings import APP_NAME, APP_ICON, PAGE_LAYOUT, BOOKMARKS_PER_PAGE, ARTICLE_CLICK_WAIT, TRANSLATION_LANGUAGES
+from utils.helpers import load_css, render_card
+from utils.compaction import compact_text
+from utils.ui_state import get_ui_state
+from utils.tracing import start_rerun, rerun_spans, summarize_spans, start_metrics_server
+from services.news_fetcher import get_news, get_available_categories, merge_news, newest_by_feed
+from services.gemini_summarizer import summarize
+from services.extractive_summarizer import summarize_extractive
+from services.text_to_speech import stream_audio, audio_seconds
+from services.translator import translate
 from services.firebase_manager import FirebaseManager
+from services.ranking import get_index, build_profile
+from services.quota import quota_status
+from services.api import start_api_server
+from services.article_fetcher import prefetch, get_body
+from services.thumbnails import prefetch_thumbnails, get_thumbnail
 
 # Page Configuration
 st.set_page_config(
@@ -20,13 +33,93 @@ fb_manager = FirebaseManager()
 # Helper to reset UI state
 def reset_ui_state():
     """Clears all ephemeral UI state (expanded summaries, audio)"""
-    keys_to_clear = [k for k in st.session_state.keys() if k.startswith((
-        "show_summary_", "show_saved_summary_", 
-        "audio_", "saved_audio_", 
-        "summarizing_", "summarizing_saved_"
-    ))]
-    for k in keys_to_clear:
-        del st.session_state[k]
+    get_ui_state().clear_flags()
+
+def session_id():
+    """Stable id of this browser session (tab), for per-session resource holds."""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+def reset_saved_pages():
+    """Drops the Saved view cursor stack and cached first page (call after bookmarks change)."""
+    st.session_state.saved_cursors = [None]
+    st.session_state.pop("saved_first_page", None)
+
+def load_bookmarks_page(user_id):
+    """
+    Returns (bookmarks, next_cursor) for the current Saved view page; next_cursor is None on
+    the last page. Reads one extra document to know whether a next page exists.
+    The first page is cached in session state until bookmarks change.
+    """
+    if "saved_cursors" not in st.session_state:
+        reset_saved_pages()
+
+    cursor = st.session_state.saved_cursors[-1]  # (saved_at, doc id) of the previous page's last item
+    # A live mirror is already in memory and sees other tabs' changes, so skip the page cache
+    use_cache = not fb_manager.is_mirrored(user_id)
+    if use_cache and cursor is None and "saved_first_page" in st.session_state:
+        return st.session_state.saved_first_page
+
+    fb_manager.flush_writes()  # Don't list bookmarks while queued saves are still in flight
+    start_after, start_after_id = cursor or (None, None)
+    # Total order (saved_at, doc id), newest first: bookmarks saved in the same instant aren't skipped
+    docs = fb_manager.get_bookmarks(user_id, page_size=BOOKMARKS_PER_PAGE + 1, start_after=start_after,
+                                    start_after_id=start_after_id, with_ids=True)
+    docs = [(doc_id, doc) for doc_id, doc in docs if doc.get('saved_at') is not None]  # Legacy docs can't be paged
+    has_next = len(docs) > BOOKMARKS_PER_PAGE
+    docs = docs[:BOOKMARKS_PER_PAGE]
+    next_cursor = (docs[-1][1]['saved_at'], docs[-1][0]) if has_next else None
+    page = ([doc for _, doc in docs], next_cursor)
+    if use_cache and cursor is None:
+        st.session_state.saved_first_page = page
+    return page
+
+def article_text(item, description):
+    """Summarizer input: the prefetched article body when available, else the feed description."""
+    body = get_body(item, wait_seconds=ARTICLE_CLICK_WAIT)
+    return compact_text(item.get('title'), body or description)
+
+def audio_language():
+    """Language code picked in the sidebar for translated audio."""
+    return st.session_state.get("tts_language", next(iter(TRANSLATION_LANGUAGES)))
+
+def play_audio(text, lang):
+    """
+    Plays text as speech, starting as soon as the first chunk is synthesized.
+    st.audio can't append to a clip that's already playing, so once every chunk is ready the
+    full clip replaces it, resuming where the first chunk has got to.
+    """
+    placeholder = st.empty()
+    chunks, started = [], None
+    for chunk in stream_audio(text, lang):
+        chunks.append(chunk)
+        if started is None:
+            placeholder.audio(chunk, format='audio/mp3', autoplay=True)
+            started = time.monotonic()
+    if len(chunks) > 1:
+        position = min(time.monotonic() - started, audio_seconds(chunks[0]))
+        placeholder.audio(b"".join(chunks), format='audio/mp3', autoplay=True, start_time=int(position))
+
+def hydrate_summaries(items, user_id):
+    """Replaces each item's description with the user's stored summary, if there is one."""
+    for item in items:
+        existing_summary = fb_manager.get_summary(item['link'], user_id)
+        if existing_summary:
+            item['summary'] = existing_summary
+
+def load_my_summaries(user_id):
+    """The user's recent summaries (ranking profile), cached in session state until they add one."""
+    if "my_summaries" not in st.session_state:
+        st.session_state.my_summaries = fb_manager.get_recent_summaries(user_id)
+    return st.session_state.my_summaries
+
+def feed_order(index, items, sort_mode, user_id, category):
+    """Feed items in display order: relevance-ranked for "For you", else as merged (newest first)."""
+    index.add(items)  # Only unseen articles are indexed
+    if sort_mode == "For you":
+        return index.rank(items, build_profile(index, load_my_summaries(user_id), category))
+    return items
 
 def update_url_routing(mode, user_email=""):
     """Updates the URL query parameters based on mode: 'login', 'saved', 'latest'."""
@@ -97,7 +190,232 @@ def login_page():
                             st.success("Account created successfully!")
                             st.rerun()
 
+def rerun_card():
+    """Reruns only the current card during a fragment rerun, otherwise the whole app."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        # scope="fragment" is rejected when the card is running as part of a full rerun
+        st.rerun()
+
+def shown_summaries(namespace, items, link_field):
+    """
+    Summaries currently expanded among a page's cards (read when a translation starts,
+    so only real summaries - not raw feed descriptions - go into the batch).
+    """
+    ui = get_ui_state()
+    return [item['summary'] for item in items
+            if item.get('summary') and ui.peek_flags(namespace, fb_manager._get_hash(item.get(link_field))).get("show_summary")]
+
+@st.fragment
+def saved_card(item, user_id, spacer=False, page_items=()):
+    """
+    One Saved Articles card. Runs as a fragment: its buttons rerun only this card.
+    page_items: the page's cards; their shown summaries are translated in the same request as this one.
+    """
+    with st.container():
+        # Use Hash key for stability
+        item_key = fb_manager._get_hash(item.get('url'))
+        flags = get_ui_state().flags("saved", item_key)
+
+        show_summary = flags.get("show_summary", False)
+        summary_text = (item.get('summary') or 'No summary available.') if show_summary else None
+
+        # --- CARD (single html block) ---
+        render_card(item.get('title'), item.get('url'), item.get('published'),
+                    item.get('source', 'Unknown Source'), summary_text, spacer=spacer,
+                    thumbnail=get_thumbnail(item.get('image')))
+
+        # --- ACTIONS ---
+        col_s_actions, col_s_audio = st.columns([1.5, 2])
+
+        with col_s_actions:
+            # Summarize Button / Badge Logic
+            if show_summary:
+                 st.markdown(":white_check_mark: **Summarized**")
+            else:
+                is_summarizing = flags.get("summarizing", False)
+                btn_text = "Summarize" if not is_summarizing else "Observing..."
+                if st.button(btn_text, key=f"btn_saved_{item_key}", disabled=is_summarizing, use_container_width=True):
+                     # Just toggle visibility since data is presumed saved with summary or fetchable
+                     flags["show_summary"] = True
+                     rerun_card()
+
+        # Audio Controls (In Saved View)
+        if show_summary:
+             lang = audio_language()
+             with col_s_audio:
+                c1, c2 = st.columns(2)
+                with c1:
+                    if st.button("Listen (EN)", key=f"saved_en_{item_key}", use_container_width=True):
+                        flags["audio"] = "en"
+                with c2:
+                    if st.button(f"Listen ({lang.upper()})", key=f"saved_tr_{item_key}", use_container_width=True):
+                         flags["audio"] = "tr"
+
+             # Audio Processing
+             if flags.get("audio") == "en":
+                with st.spinner("Generating English audio..."):
+                    play_audio(item.get('summary', ''), 'en')
+
+             if flags.get("audio") == "tr":
+                with st.spinner("Translating..."):
+                    translated = translate(item.get('summary', ''), lang,
+                                           context=shown_summaries("saved", page_items, 'url'))
+                    if translated:
+                        play_audio(translated, lang)
+
+        # Remove Action
+        with col_s_actions:
+            if st.button("Remove", key=f"del_{item_key}", use_container_width=True):
+                fb_manager.remove_bookmark(item.get('url'), user_id)
+                reset_saved_pages()
+                st.toast("Removed from bookmarks!")
+                st.rerun()  # Full rerun: the list itself changed
+
+@st.fragment
+def news_card(item, category, user_id, spacer=False, related=None, page_items=()):
+    """
+    One Latest News card. Runs as a fragment: Summarize/Listen/Save rerun only this card.
+    related: similar articles, listed under the summary once it's shown.
+    page_items: the page's cards; their shown summaries are translated in the same request as this one.
+    """
+    item_key = fb_manager._get_hash(item['link'])
+    flags = get_ui_state().flags("latest", item_key)
+
+    show_summary = flags.get("show_summary", False)
+    summary_to_show = item.get('summary', '') if show_summary else None
+
+    # --- CARD START ---
+    with st.container():
+        # Card + summary section (conditionally rendered) in one html block
+        render_card(item['title'], item['link'], item['published'],
+                    item.get('source', 'Unknown Source'), summary_to_show, spacer=spacer,
+                    related=related if show_summary else None,
+                    thumbnail=get_thumbnail(item.get('image')))
+
+        # --- ACTION BUTTONS ---
+        col_actions, col_audio = st.columns([1.5, 2])
+
+        # 1. Summarize / Saved Status
+        with col_actions:
+            if show_summary and item.get('summary_local'):
+                # Local extractive summary (Groq was unavailable) - offer another try
+                st.caption("Quick summary (AI summary unavailable)")
+                if st.button("Retry AI Summary", key=f"retry_{item_key}", use_container_width=True):
+                    flags["summarizing"] = True
+                    rerun_card()
+            elif show_summary:
+                st.markdown(":white_check_mark: **Summarized**")
+            else:
+                is_summarizing = flags.get("summarizing", False)
+                btn_text = "Summarize" if not is_summarizing else "Analyzing..."
+
+                if st.button(btn_text, key=f"btn_{item_key}", disabled=is_summarizing, use_container_width=True):
+                    flags["summarizing"] = True
+                    rerun_card()
+
+        # 2. Audio Controls
+        if show_summary and item.get('summary'):
+            lang = audio_language()
+            with col_audio:
+                c1, c2 = st.columns(2)
+                with c1:
+                    if st.button("Listen (EN)", key=f"en_{item_key}", use_container_width=True):
+                        flags["audio"] = "en"
+                with c2:
+                    if st.button(f"Listen ({lang.upper()})", key=f"tr_{item_key}", use_container_width=True):
+                        flags["audio"] = "tr"
+
+            if flags.get("audio") == "en":
+                with st.spinner("Generating audio..."):
+                    play_audio(item['summary'], 'en')
+
+            if flags.get("audio") == "tr":
+                with st.spinner("Translating..."):
+                    translated = translate(item['summary'], lang, context=shown_summaries("latest", page_items, 'link'))
+                    if translated:
+                        play_audio(translated, lang)
+
+        # Save Button
+        is_saved = fb_manager.is_bookmarked(item['link'], user_id)
+        if not is_saved:
+             with col_actions:
+                if st.button("Save", key=f"save_{item_key}"):
+                     with st.spinner("Saving..."):
+                        # A shown summary is already the user's stored one - skip the read
+                        existing = item.get('summary') if show_summary else fb_manager.get_summary(item['link'], user_id)
+                        from_llm = not item.get('summary_local')
+                        if existing:
+                            s_save = existing
+                        else:
+                            s_save, from_llm = summarize(article_text(item, item.get('summary', '')), title=item.get('title'))
+                            item['summary_local'] = not from_llm
+
+                        # Summary and bookmark are written together in one batch (local summaries aren't cached)
+                        if fb_manager.save_article(item, s_save, category, user_id, cache_summary=from_llm):
+                            reset_saved_pages()
+                            st.session_state.pop("my_summaries", None)
+                            item['summary'] = s_save
+                            flags["show_summary"] = True
+                            st.toast("Article Saved!")
+                            rerun_card()
+                        else:
+                            st.error("Failed to save article. Check your connection or Firebase configuration.")
+        else:
+             with col_actions:
+                 st.caption("✅ Saved")
+
+        # Handle Summarization
+        if flags.get("summarizing"):
+            existing = None if item.get('summary_local') else fb_manager.get_summary(item['link'], user_id)
+            if existing:
+                item['summary'] = existing
+            else:
+                # Keep the original description: a retry must summarize the article, not the fallback
+                text = article_text(item, item.setdefault('description', item.get('summary', '')))
+
+                # Instant local preview while the LLM works
+                preview = st.empty()
+                preview.caption(f"Quick summary: {summarize_extractive(text, title=item.get('title'))}")
+                with st.spinner("Reading article..."):
+                    item['summary'], from_llm = summarize(text, title=item.get('title'))
+                preview.empty()
+
+                item['summary_local'] = not from_llm
+                if from_llm:
+                    fb_manager.save_summary(item, item['summary'], category, user_id)
+                    st.session_state.pop("my_summaries", None)
+
+            flags["show_summary"] = True
+            flags["summarizing"] = False
+            rerun_card()
+
+def render_timing_panel():
+    """Sidebar breakdown of where this rerun's time went (admins only, see ADMIN_EMAILS)."""
+    user = st.session_state.get("user")
+    if not user or user.get('email', '').lower() not in settings.ADMIN_EMAILS:
+        return
+    spans, elapsed = rerun_spans()
+    with st.sidebar.expander(f"Timing: {elapsed * 1000:.0f} ms this rerun"):
+        if not spans:
+            st.caption("No traced calls in this rerun.")
+        for name, calls, total in summarize_spans(spans):
+            st.caption(f"{name} x{calls}: {total * 1000:.1f} ms")
+        for provider, quota in quota_status().items():
+            paused = f", paused {quota['paused_for'] / 60:.0f} min" if quota['paused_for'] else ""
+            st.caption(f"{provider} quota: {quota['used']}/{quota['limit']} used today{paused}")
+        if settings.METRICS_PORT:
+            st.caption(f"p50/p95/p99: http://127.0.0.1:{settings.METRICS_PORT}/metrics")
+
 def main():
+    start_rerun()
+    start_metrics_server(settings.METRICS_PORT)
+    start_api_server(settings.API_PORT, settings.API_HOST)
+    render_page()
+    render_timing_panel()
+
+def render_page():
     
     # --- Authentication Check ---
     if "user" not in st.session_state:
@@ -109,6 +427,12 @@ def main():
 
     user_id = st.session_state.user['localId']
     user_email = st.session_state.user.get('email', 'User')
+    fb_manager.start_listeners(user_id, session_id())  # Idempotent: keeps the user's data mirror hot
+    failed_saves = fb_manager.pop_failed_writes(user_id)  # Background saves that didn't commit
+    if failed_saves:
+        reset_saved_pages()
+        for title in failed_saves:
+            st.error(f"Couldn't save \"{title}\". Please try again.")
 
     # --- Navigation Logic with History Support ---
     
@@ -137,7 +461,9 @@ def main():
             st.rerun()
 
         if st.button("Logout"):
+            fb_manager.release_listeners(user_id, session_id())  # Other tabs keep the mirror
             st.session_state.user = None
+            reset_saved_pages()
             st.rerun()
             
         st.markdown("---")
@@ -198,6 +524,9 @@ def main():
                 reset_ui_state()
                 st.session_state.last_category = category
         
+        st.selectbox("Audio Language", list(TRANSLATION_LANGUAGES), format_func=TRANSLATION_LANGUAGES.get,
+                     key="tts_language")
+
         st.markdown("---")
         st.info("Powered by Groq (Llama 3.3), NewsAPI, GNews & RSS Feeds")
 
@@ -207,128 +536,90 @@ def main():
     # Handle View Selection
     if view_option == "Saved Articles":
         st.title("Saved Articles")
-        bookmarks = fb_manager.get_bookmarks(user_id)
+        bookmarks, next_cursor = load_bookmarks_page(user_id)
+        saved_page = len(st.session_state.saved_cursors) - 1
         
         if not bookmarks:
+            if saved_page > 0:
+                # Page emptied (e.g. last item removed) - go back to the start
+                reset_saved_pages()
+                st.rerun()
             st.info("No saved articles yet. Go to 'Latest News' and click 'Save' to bookmark articles.")
             return
 
         for i, item in enumerate(bookmarks):
-             with st.container():
-                # Use Hash key for stability
-                item_key = fb_manager._get_hash(item.get('url'))
-                
-                show_summary = st.session_state.get(f"show_saved_summary_{item_key}", False)
-                summary_text = item.get('summary', 'No summary available.') if show_summary else ""
-
-                # --- CARD START ---
-                st.markdown(f"""
-                <div class="news-card">
-                    <a href="{item.get('url')}" target="_blank" class="news-title">{item.get('title')}</a>
-                    <div class="news-meta">
-                        <span>Date: {format_date(item.get('published'))}</span>
-                        <span>|</span>
-                        <span>Source: {item.get('source', 'Unknown Source')}</span>
-                    </div>
-                """, unsafe_allow_html=True)
-
-                if show_summary:
-                    st.markdown(f"""
-                    <div class="summary-section">
-                        <div class="summary-text">{summary_text}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                st.markdown("</div>", unsafe_allow_html=True) # Close Card
+            saved_card(item, user_id, spacer=i > 0, page_items=bookmarks)
 
-                # --- ACTIONS ---
-                col_s_actions, col_s_audio = st.columns([1.5, 2])
-                
-                with col_s_actions:
-                    # Summarize Button / Badge Logic
-                    if show_summary:
-                         st.markdown(":white_check_mark: **Summarized**")
-                    else:
-                        is_summarizing = st.session_state.get(f"summarizing_saved_{item_key}", False)
-                        btn_text = "Summarize" if not is_summarizing else "Observing..."
-                        if st.button(btn_text, key=f"btn_saved_{item_key}", disabled=is_summarizing, use_container_width=True):
-                             # Just toggle visibility since data is presumed saved with summary or fetchable
-                             st.session_state[f"show_saved_summary_{item_key}"] = True
-                             st.rerun()
-
-                # Audio Controls (In Saved View)
-                if show_summary:
-                     with col_s_audio:
-                        c1, c2 = st.columns(2)
-                        with c1:
-                            if st.button("Listen (EN)", key=f"saved_en_{item_key}", use_container_width=True):
-                                st.session_state[f"saved_audio_en_{item_key}"] = True
-                                st.session_state[f"saved_audio_hi_{item_key}"] = False
-                        with c2:
-                            if st.button("Listen (HI)", key=f"saved_hi_{item_key}", use_container_width=True):
-                                 st.session_state[f"saved_audio_hi_{item_key}"] = True
-                                 st.session_state[f"saved_audio_en_{item_key}"] = False
-
-                     # Audio Processing
-                     if st.session_state.get(f"saved_audio_en_{item_key}"):
-                        with st.spinner("Generating English audio..."):
-                            ab = text_to_audio(item.get('summary', ''), lang='en')
-                            if ab: st.audio(ab, format='audio/mp3', autoplay=True)
-                    
-                     if st.session_state.get(f"saved_audio_hi_{item_key}"):
-                        with st.spinner("Translating..."):
-                            hs = translate_to_hindi(item.get('summary', ''))
-                            if hs:
-                                ab = text_to_audio(hs, lang='hi')
-                                if ab: st.audio(ab, format='audio/mp3', autoplay=True)
-
-                # Remove Action
-                with col_s_actions:
-                    if st.button("Remove", key=f"del_{item_key}", use_container_width=True):
-                        fb_manager.remove_bookmark(item.get('url'), user_id)
-                        st.toast("Removed from bookmarks!")
-                        st.rerun()
-                
-                st.markdown("<br>", unsafe_allow_html=True)
+        # Saved Pagination (cursor based)
+        st.markdown("---")
+        col_prev, col_center, col_next = st.columns([1, 2, 1])
+        
+        with col_prev:
+            if saved_page > 0:
+                if st.button("Previous Page", key="saved_prev"):
+                    reset_ui_state()
+                    st.session_state.saved_cursors.pop()
+                    st.rerun()
+        
+        with col_center:
+            st.markdown(f"<p style='text-align: center;'>Page {saved_page + 1}</p>", unsafe_allow_html=True)
+        
+        with col_next:
+            if next_cursor:
+                if st.button("Next Page", key="saved_next"):
+                    reset_ui_state()
+                    st.session_state.saved_cursors.append(next_cursor)
+                    st.rerun()
         return  # Stop execution here for Saved View
 
     # Main Content - Latest News
     st.title(f"{category} News")
     
-    # Session State Persistence for News Feed
-    if "category_cache" not in st.session_state:
-        st.session_state.category_cache = {}
+    # Session State Persistence for News Feed (LRU: only the last few categories are kept)
+    ui = get_ui_state()
 
     # Determine if we need to fetch new data
-    cached_data = st.session_state.category_cache.get(category)
+    cached_data = ui.category(category)
     should_fetch = cached_data is None
 
-    # Force Refresh Button
+    # Force Refresh Button + Ordering
     col_ref, col_page = st.columns([1, 1])
     with col_ref:
         if st.button("Force Refresh"):
             should_fetch = True
+    with col_page:
+        sort_mode = st.radio("Order", ["Latest", "For you"], key="feed_sort", horizontal=True, label_visibility="collapsed")
     
-    if should_fetch:
+    items_per_page = 10
+    # Relevance: shared per-category TF-IDF index
+    index = get_index(category)
+
+    if should_fetch and cached_data is not None:
+        # Incremental refresh: fetch only what's newer than each feed's newest known item and
+        # merge it in by canonical hash. Existing items keep their summaries; the first
+        # article on the current page (in the order shown) stays on screen.
+        with st.spinner(f"Checking for new {category} articles..."):
+            fresh_news = get_news(category, since=newest_by_feed(cached_data["items"]))
+
+        old_items = feed_order(index, cached_data["items"], sort_mode, user_id, category)
+        first_visible = old_items[min(cached_data["page"] * items_per_page, len(old_items) - 1)] if old_items else None
+        news_items, new_items = merge_news(cached_data["items"], fresh_news)
+        hydrate_summaries(new_items, user_id)
+        prefetch(new_items)  # Article bodies download in the background for later summaries
+        prefetch_thumbnails([i.get('image') for i in new_items])
+
+        shown = feed_order(index, news_items, sort_mode, user_id, category)
+        page = shown.index(first_visible) // items_per_page if first_visible is not None else 0
+        cached_data = ui.put_category(category, news_items, page)
+        count = len(new_items)
+        st.success(f"{count} new article{'s' if count != 1 else ''}")
+    elif should_fetch:
         # --- START FETCH LOGIC ---
-        
-        # 1. Check User Scoped Summaries Cache (optional logic)
-        # For Main Feed, we mainly fetch LIVE news. We can implement a smarter merge if needed.
-        # fb_manager.get_user_summaries_feed(user_id, category) 
-        # But for now, let's keep fetch_news() as is, and check individual items for existing summaries.
-        
-        news_items = []
-        is_refresh_click = (category in st.session_state.category_cache) and should_fetch
-        
-        # We always fetch live news for main feed to ensure freshness
         fetch_msg_container = st.empty()
-        if is_refresh_click:
-            fetch_msg_container.info("Fetching live news...")
-        else:
-            fetch_msg_container.info("Fetching latest news...")
+        fetch_msg_container.info("Fetching latest news...")
             
         with st.spinner(f"Fetching {category} news..."):
-            live_news = fetch_news(category)
+            live_news = get_news(category)
         
         fetch_msg_container.empty()
         
@@ -339,151 +630,34 @@ def main():
         # Merge with User Summaries Logic
         # We want to check if the user already has a summary for these items
         news_items = live_news 
-        for item in news_items:
-            existing_summary = fb_manager.get_summary(item['link'], user_id)
-            if existing_summary:
-                item['summary'] = existing_summary
+        hydrate_summaries(news_items, user_id)
+        prefetch(news_items)  # Article bodies download in the background for later summaries
+        prefetch_thumbnails([i.get('image') for i in news_items])
     
         # SAVE TO CATEGORY CACHE
-        st.session_state.category_cache[category] = {
-            "items": news_items,
-            "page": 0
-        }
+        cached_data = ui.put_category(category, news_items)
     else:
         # Load from Category Cache
-        news_items = st.session_state.category_cache[category]["items"]
+        news_items = cached_data["items"]
+
+    news_items = feed_order(index, news_items, sort_mode, user_id, category)
 
     # Display Logic - Next/Previous Pagination
     total_news = len(news_items)
-    items_per_page = 10
     num_pages = (total_news + items_per_page - 1) // items_per_page
     
-    current_page = st.session_state.category_cache[category]["page"]
+    current_page = cached_data["page"]
     start_idx = current_page * items_per_page
     end_idx = min(start_idx + items_per_page, total_news)
     
     st.markdown(f"<div style='margin-bottom: 20px; font-weight: 500; color: gray;'>Showing {start_idx + 1} - {end_idx} of {total_news} articles</div>", unsafe_allow_html=True)
     
     # News Loop
+    related = index.related(news_items[start_idx:end_idx], k=3)
+    page_items = news_items[start_idx:end_idx]
     for i in range(start_idx, end_idx):
-        item = news_items[i]
-        item_key = fb_manager._get_hash(item['link'])
-        
-        show_summary = st.session_state.get(f"show_summary_{item_key}", False)
-        summary_to_show = item.get('summary', '') if show_summary else ""
-        
-        # --- CARD START ---
-        with st.container():
-            # Card Wrapper
-            st.markdown(f"""
-            <div class="news-card">
-                <a href="{item['link']}" target="_blank" class="news-title">{item['title']}</a>
-                <div class="news-meta">
-                    <span>Date: {format_date(item['published'])}</span>
-                    <span>|</span>
-                    <span>Source: {item.get('source', 'Unknown Source')}</span>
-                </div>
-            """, unsafe_allow_html=True)
-
-            # --- SUMMARY SECTION (Conditionally Rendered) ---
-            if show_summary:
-                st.markdown(f"""
-                <div class="summary-section">
-                    <div class="summary-text">{summary_to_show}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            st.markdown("</div>", unsafe_allow_html=True) # Close Card
-            
-            # --- ACTION BUTTONS ---
-            col_actions, col_audio = st.columns([1.5, 2])
-            
-            # 1. Summarize / Saved Status
-            with col_actions:
-                if show_summary:
-                    st.markdown(":white_check_mark: **Summarized**")
-                else:
-                    summarizing_key = f"summarizing_{item_key}"
-                    is_summarizing = st.session_state.get(summarizing_key, False)
-                    btn_text = "Summarize" if not is_summarizing else "Analyzing..."
-                    
-                    if st.button(btn_text, key=f"btn_{item_key}", disabled=is_summarizing, use_container_width=True):
-                        st.session_state[summarizing_key] = True
-                        st.rerun()
-
-            # 2. Audio Controls
-            if show_summary and item.get('summary'):
-                with col_audio:
-                    c1, c2 = st.columns(2)
-                    with c1:
-                        if st.button("Listen (EN)", key=f"en_{item_key}", use_container_width=True):
-                            st.session_state[f"audio_en_{item_key}"] = True
-                            st.session_state[f"audio_hi_{item_key}"] = False
-                    with c2:
-                        if st.button("Listen (HI)", key=f"hi_{item_key}", use_container_width=True):
-                            st.session_state[f"audio_hi_{item_key}"] = True
-                            st.session_state[f"audio_en_{item_key}"] = False
-
-                if st.session_state.get(f"audio_en_{item_key}"):
-                    with st.spinner("Generating audio..."):
-                        ab = text_to_audio(item['summary'], lang='en')
-                        if ab: st.audio(ab, format='audio/mp3', autoplay=True)
-                
-                if st.session_state.get(f"audio_hi_{item_key}"):
-                    with st.spinner("Translating..."):
-                        hs = translate_to_hindi(item['summary'])
-                        if hs:
-                            ab = text_to_audio(hs, lang='hi')
-                            if ab: st.audio(ab, format='audio/mp3', autoplay=True)
-
-            # Save Button
-            is_saved = fb_manager.is_bookmarked(item['link'], user_id)
-            if not is_saved:
-                 with col_actions:
-                    if st.button("Save", key=f"save_{item_key}"):
-                         with st.spinner("Saving..."):
-                            # Initialize variables to prevent UnboundLocalError
-                            success_summary = False
-                            success_bookmark = False
-                            
-                            existing = fb_manager.get_summary(item['link'], user_id)
-                            if existing:
-                                s_save = existing
-                            else:
-                                t = f"{item.get('title')}. {item.get('summary', '')}"
-                                s_save = summarize_text(t)
-                            
-                            # Always save both summary and bookmark
-                            success_summary = fb_manager.save_summary(item, s_save, category, user_id)
-                            success_bookmark = fb_manager.save_bookmark(item, user_id)
-                            
-                            if success_summary and success_bookmark:
-                                item['summary'] = s_save
-                                st.session_state[f"show_summary_{item_key}"] = True
-                                st.toast("Article Saved!")
-                                st.rerun()
-                            else:
-                                st.error("Failed to save article. Check your connection or Firebase configuration.")
-            else:
-                 with col_actions:
-                     st.caption("✅ Saved")
-
-            # Handle Summarization
-            if st.session_state.get(f"summarizing_{item_key}"):
-                with st.spinner("Reading article..."):
-                    existing = fb_manager.get_summary(item['link'], user_id)
-                    if existing:
-                        item['summary'] = existing
-                    else:
-                        t = f"{item.get('title')}. {item.get('summary', '')}"
-                        item['summary'] = summarize_text(t)
-                        fb_manager.save_summary(item, item['summary'], category, user_id)
-                    
-                    st.session_state[f"show_summary_{item_key}"] = True
-                    st.session_state[f"summarizing_{item_key}"] = False
-                    st.rerun()
-             
-            st.markdown("<br>", unsafe_allow_html=True) # Spacer
+        news_card(news_items[i], category, user_id, spacer=i > start_idx, related=related[i - start_idx],
+                  page_items=page_items)
 
     # Pagination Navigation
     st.markdown("---")
@@ -493,7 +667,7 @@ def main():
         if current_page > 0:
             if st.button("Previous Page"):
                 reset_ui_state()
-                st.session_state.category_cache[category]["page"] -= 1
+                cached_data["page"] -= 1
                 st.rerun()
     
     with col_center:
@@ -503,7 +677,7 @@ def main():
         if current_page < num_pages - 1:
             if st.button("Next Page"):
                 reset_ui_state()
-                st.session_state.category_cache[category]["page"] += 1
+                cached_data["page"] += 1
                 st.rerun()
 
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+"""
+End-to-end offline benchmark.
+
+Starts local fake upstreams (NewsAPI, GNews, RSS, Groq - see fake_upstreams.py), points
+the app at them with an in-memory store instead of Firestore, and drives logged-in
+sessions through Streamlit's AppTest. For each concurrency level it reports:
+
+  load      first run of the Latest News page (live fetch of the category)
+  rerun     a plain rerun with the category cached
+  summarize clicking Summarize on the first card (Groq round trip + store write)
+  memory    resident memory growth per session and process peak RSS
+            (--tracemalloc adds Python heap growth, but slows everything ~2x)
+
+plus p50/p95 of the traced upstream spans. No network access is needed.
+
+Usage:
+    python -m benchmarks.e2e [--sessions 1,10,100] [--groq-latency 0.3] [--json]
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(PROJECT_ROOT, "app.py")
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.fake_upstreams import FakeUpstreams  # noqa: E402
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000 if values else 0.0
+
+
+def allow_concurrent_apptests():
+    """
+    AppTest installs a process-global mock Runtime for each run and clears it when the run
+    ends, which breaks overlapping runs in other threads. Keep the last one reachable so
+    sessions can run concurrently like they do under a real server.
+    """
+    from streamlit.runtime import Runtime
+
+    original = Runtime.instance.__func__
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+            return cls._instance
+        return last["runtime"] if "runtime" in last else original(cls)
+
+    Runtime.instance = classmethod(instance)
+
+
+def run_session(session_no, category, timeout):
+    """One user session: load the category, rerun, summarize the first card. Returns timings."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.session_state["user"] = {"localId": f"bench-user-{session_no}", "email": f"bench{session_no}@example.com"}
+    at.session_state["last_category"] = category
+
+    timings = {}
+    start = time.perf_counter()
+    at.run()
+    timings["load"] = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"session {session_no}: {at.exception[0].message}")
+
+    start = time.perf_counter()
+    at.run()
+    timings["rerun"] = time.perf_counter() - start
+
+    summarize = [b for b in at.button if b.label == "Summarize"]
+    if summarize:
+        start = time.perf_counter()
+        summarize[0].click().run()
+        timings["summarize"] = time.perf_counter() - start
+    return timings
+
+
+def current_rss_mb():
+    """Resident set size of this process (Linux /proc; falls back to the peak elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_level(sessions, category, timeout, trace_heap=False):
+    """Runs `sessions` concurrent sessions and aggregates their timings."""
+    if trace_heap:
+        tracemalloc.start()
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(lambda n: run_session(n, category, timeout), range(sessions)))
+    wall = time.perf_counter() - started
+    rss_after = current_rss_mb()
+
+    report = {"sessions": sessions, "wall_s": wall}
+    for phase in ("load", "rerun", "summarize"):
+        values = [r[phase] for r in results if phase in r]
+        report[phase] = {"p50_ms": _pct(values, 0.5), "p95_ms": _pct(values, 0.95), "n": len(values)}
+    report["rss_per_session_kb"] = max(0.0, rss_after - rss_before) * 1024 / sessions
+    report["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if trace_heap:
+        heap, heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report["heap_per_session_kb"] = heap / 1024 / sessions
+        report["heap_peak_mb"] = heap_peak / 1024 / 1024
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,10,100", help="comma-separated concurrency levels")
+    parser.add_argument("--category", default="Technology")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="NewsAPI/GNews server time (s)")
+    parser.add_argument("--rss-latency", type=float, default=0.08, help="RSS server time (s)")
+    parser.add_argument("--groq-latency", type=float, default=0.3, help="Groq completion time (s)")
+    parser.add_argument("--rss-items", type=int, default=50, help="items per RSS feed")
+    parser.add_argument("--timeout", type=float, default=120, help="AppTest timeout per run (s)")
+    parser.add_argument("--tracemalloc", action="store_true", help="also measure Python heap per session")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    latency = {"newsapi": args.api_latency, "gnews": args.api_latency,
+               "rss": args.rss_latency, "groq": args.groq_latency}
+    with FakeUpstreams(latency=latency, rss_items=args.rss_items) as fake:
+        os.environ.update(fake.env())
+        os.environ.setdefault("METRICS_PORT", "0")
+        from services import news_fetcher
+        from utils import tracing
+
+        news_fetcher.RSS_FEEDS.update(fake.rss_feeds(news_fetcher.RSS_FEEDS.keys()))
+        allow_concurrent_apptests()
+
+        levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+        reports = [run_level(n, args.category, args.timeout, args.tracemalloc) for n in levels]
+        spans = tracing.snapshot()
+        hits = dict(fake.hits)
+
+    if args.json:
+        print(json.dumps({"levels": reports, "spans": spans, "upstream_hits": hits}, indent=2, default=str))
+        return 0
+
+    print(f"{'sessions':>8} {'load p50/p95 ms':>18} {'rerun p50/p95 ms':>18} {'summ. p50/p95 ms':>18}"
+          f" {'RSS/sess KB':>12} {'peak RSS MB':>12} {'wall s':>7}")
+    for r in reports:
+        cells = [f"{r[p]['p50_ms']:.0f}/{r[p]['p95_ms']:.0f}" for p in ("load", "rerun", "summarize")]
+        print(f"{r['sessions']:>8} {cells[0]:>18} {cells[1]:>18} {cells[2]:>18}"
+              f" {r['rss_per_session_kb']:>12.0f} {r['peak_rss_mb']:>12.0f} {r['wall_s']:>7.1f}")
+        if "heap_per_session_kb" in r:
+            print(f"{'':>8} python heap: {r['heap_per_session_kb']:.0f} KB/session, peak {r['heap_peak_mb']:.1f} MB")
+
+    print("\nUpstream spans (all levels):")
+    for name in sorted(spans):
+        s = spans[name]
+        print(f"  {name:<36} n={s['count']:<6} p50={s['p50'] * 1000:7.1f} ms  p95={s['p95'] * 1000:7.1f} ms")
+    print(f"\nUpstream requests: {hits}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
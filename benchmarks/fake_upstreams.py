@@ -0,0 +1,263 @@
+"""
+Local stand-ins for every upstream PulseAI talks to, served from one threaded HTTP server:
+
+    /newsapi/v2/top-headlines               NewsAPI.org JSON
+    /gnews/api/v4/top-headlines             GNews.io JSON
+    /rss/<category>/<n>.xml                 RSS 2.0 feeds (realistic payload sizes)
+    /article/<source>/<category>/<i>        article pages the feeds link to (HTML + boilerplate)
+    /image/<source>/<i>.jpg                 full-size article images (1600x900 JPEG)
+    /groq/openai/v1/chat/completions        OpenAI-compatible chat completions (Groq)
+
+Latency per upstream is configurable so benchmarks can model slow providers.
+Use `env()` for the settings that point the app at the server.
+"""
+import io
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+WORDS = (
+    "market policy election climate research launch court energy health league study "
+    "company startup data network city report season vaccine budget chip model growth "
+    "storm trade minister team players results scientists announced according officials"
+).split()
+
+
+def _sentence(rng, n_words):
+    words = [rng.choice(WORDS) for _ in range(n_words)]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng, n_sentences):
+    return " ".join(_sentence(rng, rng.randint(8, 18)) for _ in range(n_sentences))
+
+
+class FakeUpstreams:
+    """Threaded HTTP server with fake NewsAPI, GNews, RSS and Groq endpoints."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=None, rss_items=50, seed=7):
+        # Seconds of simulated server time per upstream
+        self.latency = {"newsapi": 0.0, "gnews": 0.0, "rss": 0.0, "groq": 0.0, "article": 0.0, "image": 0.0, **(latency or {})}
+        self.rss_items = rss_items
+        self.seed = seed
+        self.hits = {"newsapi": 0, "gnews": 0, "rss": 0, "groq": 0, "article": 0, "image": 0}
+        self._hits_lock = threading.Lock()
+        self._rss_cache = {}
+        self._image_bytes = None
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    # --- Lifecycle ---
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-upstreams", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def env(self):
+        """Settings that point PulseAI at this server (set before the app reads them)."""
+        return {
+            "NEWS_API_ORG": "fake-newsapi-key",
+            "GNEWS_IO": "fake-gnews-key",
+            "GROQ_API_KEY": "fake-groq-key",
+            "FIREBASE_WEB_API_KEY": "fake-firebase-key",
+            "NEWSAPI_BASE_URL": f"{self.base_url}/newsapi",
+            "GNEWS_BASE_URL": f"{self.base_url}/gnews",
+            "GROQ_BASE_URL": f"{self.base_url}/groq",
+            "STORAGE_BACKEND": "memory",
+            "QUOTA_STORE_PATH": ":memory:",  # every run starts with a full daily allowance
+        }
+
+    def rss_feeds(self, categories, feeds_per_category=2):
+        """RSS_FEEDS-shaped mapping of category -> local feed URLs."""
+        return {
+            category: [f"{self.base_url}/rss/{category}/{n}.xml" for n in range(feeds_per_category)]
+            for category in categories
+        }
+
+    # --- Payloads ---
+
+    def _articles(self, source, category, count):
+        rng = random.Random(f"{self.seed}-{source}-{category}")
+        now = datetime.now(timezone.utc)
+        articles = []
+        for i in range(count):
+            articles.append({
+                "title": _sentence(rng, rng.randint(6, 12))[:-1],
+                "url": f"{self.base_url}/article/{source}/{category.lower()}/{i}",
+                "publishedAt": (now - timedelta(minutes=7 * i + rng.randint(0, 6))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "description": _paragraph(rng, rng.randint(2, 4)),
+                "image": f"{self.base_url}/image/{source}/{i}.jpg",
+                "urlToImage": f"{self.base_url}/image/{source}/{i}.jpg",
+                "source": {"name": f"{source.title()} Wire"},
+            })
+        return articles
+
+    def _rss(self, category, feed_no):
+        key = (category, feed_no)
+        if key not in self._rss_cache:
+            rng = random.Random(f"{self.seed}-rss-{category}-{feed_no}")
+            now = datetime.now(timezone.utc)
+            items = []
+            for i in range(self.rss_items):
+                desc = f"<p>{_paragraph(rng, rng.randint(3, 6))}</p><p>Continue reading...</p>"
+                items.append(
+                    "<item>"
+                    f"<title>{_sentence(rng, rng.randint(6, 12))[:-1]}</title>"
+                    f"<link>{self.base_url}/article/rss{feed_no}/{category.lower()}/{i}</link>"
+                    f"<guid>{self.base_url}/article/rss{feed_no}/{category.lower()}/{i}</guid>"
+                    f"<pubDate>{format_datetime(now - timedelta(minutes=11 * i + feed_no))}</pubDate>"
+                    f"<description><![CDATA[{desc}]]></description>"
+                    f'<media:content url="{self.base_url}/image/rss{feed_no}/{i}.jpg" medium="image"/>'
+                    "</item>"
+                )
+            self._rss_cache[key] = (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>'
+                f"<title>Fake {category} Feed {feed_no}</title><link>https://rss{feed_no}.example.com</link>"
+                f"<description>Benchmark feed</description>{''.join(items)}</channel></rss>"
+            ).encode("utf-8")
+        return self._rss_cache[key]
+
+    def _article(self, path):
+        rng = random.Random(f"{self.seed}-{path}")
+        paragraphs = "".join(f"<p>{_paragraph(rng, rng.randint(3, 6))}</p>" for _ in range(rng.randint(5, 12)))
+        return (
+            "<!doctype html><html><head><title>Article</title><script>var tracking = 1;</script></head><body>"
+            '<header><nav><a href="/">Home</a> <a href="/world">World</a></nav></header>'
+            f"<main><article><h1>{_sentence(rng, 9)}</h1>"
+            '<div class="byline">By Staff Reporter</div>'
+            f'<div class="article-body">{paragraphs}</div>'
+            '<div class="share-tools"><p>Share this story on every social network you can find today.</p></div>'
+            "</article></main>"
+            '<aside class="related"><p>Related: another story you might like to read right now.</p></aside>'
+            "<footer><p>Copyright Example News. All rights reserved. Terms and privacy policy apply.</p></footer>"
+            "</body></html>"
+        ).encode("utf-8")
+
+    def _image(self, path):
+        """A full-size (1600x900) JPEG, like the originals real feeds link to."""
+        if self._image_bytes is None:
+            from PIL import Image
+
+            image = Image.linear_gradient("L").resize((1600, 900)).convert("RGB")
+            out = io.BytesIO()
+            image.save(out, "JPEG", quality=90)
+            self._image_bytes = out.getvalue()
+        return self._image_bytes
+
+    @staticmethod
+    def _translation(prompt):
+        """JSON reply to a translator prompt: {"<id>": {"<lang>": "[<lang>] <text>"}} for every source text."""
+        try:
+            source = json.loads(prompt.rsplit("\n\n", 1)[1])
+        except (IndexError, ValueError):
+            return "{}"
+        langs = re.findall(r"\(([\w-]+)\)", prompt.split("\n", 1)[0])
+        return json.dumps({i: {lang: f"[{lang}] {text}" for lang in langs} for i, text in source.items()},
+                          ensure_ascii=False)
+
+    @staticmethod
+    def _completion(request):
+        prompt = request["messages"][-1]["content"]
+        text = "Officials announced the main facts of the story. The report outlines what happens next."
+        if (request.get("response_format") or {}).get("type") == "json_object":
+            text = FakeUpstreams._translation(prompt)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake-model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4,
+                      "total_tokens": (len(prompt) + len(text)) // 4},
+        }
+
+    # --- HTTP ---
+
+    def _hit(self, upstream):
+        with self._hits_lock:
+            self.hits[upstream] += 1
+        if self.latency[upstream]:
+            time.sleep(self.latency[upstream])
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real upstreams
+
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client gave up (e.g. missed its latency budget)
+
+            def _json(self, payload, status=200):
+                self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip("/").split("/")
+                if url.path == "/newsapi/v2/top-headlines":
+                    fake._hit("newsapi")
+                    count = int(query.get("pageSize", ["10"])[0])
+                    category = query.get("category", ["general"])[0]
+                    self._json({"status": "ok", "totalResults": count,
+                                "articles": fake._articles("newsapi", category, count)})
+                elif url.path == "/gnews/api/v4/top-headlines":
+                    fake._hit("gnews")
+                    count = int(query.get("max", ["10"])[0])
+                    category = query.get("category", ["general"])[0]
+                    self._json({"totalArticles": count, "articles": fake._articles("gnews", category, count)})
+                elif len(parts) == 4 and parts[0] == "article":
+                    fake._hit("article")
+                    self._send(200, fake._article(url.path), "text/html; charset=utf-8")
+                elif len(parts) == 3 and parts[0] == "image":
+                    fake._hit("image")
+                    self._send(200, fake._image(url.path), "image/jpeg")
+                elif len(parts) == 3 and parts[0] == "rss":
+                    fake._hit("rss")
+                    self._send(200, fake._rss(parts[1], int(parts[2].split(".")[0])), "application/rss+xml")
+                else:
+                    self._json({"error": "not found"}, status=404)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+                if self.path.rstrip("/") == "/groq/openai/v1/chat/completions":
+                    fake._hit("groq")
+                    self._json(fake._completion(json.loads(body or b"{}")))
+                else:
+                    self._json({"error": "not found"}, status=404)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
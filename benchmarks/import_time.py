@@ -0,0 +1,88 @@
+"""
+Import-time benchmark for cold start.
+
+Imports app.py in fresh interpreters with `python -X importtime`, reports the median
+total and the slowest modules, and fails (exit 1) when:
+  - the median import time is over the startup budget, or
+  - a heavy service dependency is imported at startup (they must load on first use).
+
+Usage:
+    python -m benchmarks.import_time [--runs 5] [--budget-ms 1000] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Must not be imported just by loading the app (login page / cold start)
+LAZY_MODULES = ("firebase_admin", "groq", "gtts", "feedparser", "bs4", "requests", "httpx")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr):
+    """Parses -X importtime output into [(module, self_us, cumulative_us, depth), ...]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_part, cumulative_us, name = line.split("|", 2)
+        self_us = int(self_part.split(":")[1])
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), self_us, int(cumulative_us), depth))
+    return rows
+
+
+def measure_once(module="app"):
+    """Imports `module` in a fresh interpreter and returns the parsed importtime rows."""
+    env = dict(os.environ, STORAGE_BACKEND=os.environ.get("STORAGE_BACKEND", "memory"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="max median import time")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    args = parser.parse_args(argv)
+
+    totals, runs = [], []
+    for _ in range(args.runs):
+        rows = measure_once(args.module)
+        runs.append(rows)
+        totals.append(sum(cum for _, _, cum, depth in rows if depth == 0) / 1000)
+
+    median_ms = statistics.median(totals)
+    rows = runs[totals.index(sorted(totals)[len(totals) // 2])]
+
+    print(f"import {args.module}: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f}, budget {args.budget_ms:.0f})")
+    print("\nSlowest modules (cumulative, median run):")
+    for name, self_us, cum_us, depth in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"  {cum_us / 1000:8.1f} ms  {self_us / 1000:7.1f} ms self  {name}")
+
+    imported = {name.split(".")[0] for name, _, _, _ in rows}
+    eager = [m for m in LAZY_MODULES if m in imported]
+
+    failed = False
+    if eager:
+        print(f"\nFAIL: imported at startup (should be lazy): {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\nFAIL: median import time {median_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("\nOK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
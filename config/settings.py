@@ -57,14 +57,144 @@ APP_NAME = "PulseAI"
 APP_ICON = ""
 PAGE_LAYOUT = "wide"
 
-# API Keys - Load securely from st.secrets or .env
-GROQ_API_KEY = get_secret("GROQ_API_KEY", required=True)
-FIREBASE_WEB_API_KEY = get_secret("FIREBASE_WEB_API_KEY", required=True)
-NEWS_API_KEY = get_secret("NEWS_API_ORG", required=False)  # Optional
-GNEWS_API_KEY = get_secret("GNEWS_IO", required=False)     # Optional
-
-# Gemini (COMMENTED OUT - Using Groq instead)
-# GEMINI_API_KEY = get_secret("GEMINI_API_KEY", required=False)
+def _flag(key_name, default="false"):
+    """Reads an on/off secret ("1", "true" or "yes" mean on)."""
+    return str(get_secret(key_name, required=False) or default).lower() in ("1", "true", "yes")
+
+# Secret-backed settings are resolved on first access (see __getattr__ below), not at import,
+# so cold start and the login page don't pay for lookups they never use.
+_LAZY_SETTINGS = {
+    # API Keys - Load securely from st.secrets or .env
+    # Checked where they're used (summaries fall back, login shows an error), so a missing key
+    # resolves to None instead of raising on every access
+    "GROQ_API_KEY": lambda: get_secret("GROQ_API_KEY", required=False),
+    "FIREBASE_WEB_API_KEY": lambda: get_secret("FIREBASE_WEB_API_KEY", required=False),
+    "NEWS_API_KEY": lambda: get_secret("NEWS_API_ORG", required=False),  # Optional
+    "GNEWS_API_KEY": lambda: get_secret("GNEWS_IO", required=False),     # Optional
+
+    # Upstream base URLs (overridable, e.g. to point benchmarks at local fake servers)
+    "NEWSAPI_BASE_URL": lambda: get_secret("NEWSAPI_BASE_URL", required=False) or "https://newsapi.org",
+    "GNEWS_BASE_URL": lambda: get_secret("GNEWS_BASE_URL", required=False) or "https://gnews.io",
+    "GROQ_BASE_URL": lambda: get_secret("GROQ_BASE_URL", required=False),  # None = Groq SDK default
+
+    # Gemini (COMMENTED OUT - Using Groq instead)
+    # "GEMINI_API_KEY": lambda: get_secret("GEMINI_API_KEY", required=False),
+
+    # Storage for summaries/bookmarks: "firestore" (default), "sqlite" or "memory" (no network)
+    "STORAGE_BACKEND": lambda: (get_secret("STORAGE_BACKEND", required=False) or "firestore").lower(),
+    "SQLITE_DB_PATH": lambda: get_secret("SQLITE_DB_PATH", required=False) or "pulseai.db",
+
+    # Keep a per-user in-memory mirror of summaries/bookmarks fed by Firestore snapshot listeners
+    "REALTIME_LISTENERS": lambda: _flag("REALTIME_LISTENERS", default="true"),
+
+    # Commit Save (summary + bookmark) in the background so the UI doesn't wait for Firestore
+    "WRITE_BEHIND_SAVES": lambda: _flag("WRITE_BEHIND_SAVES"),
+
+    # Use an HTTP/2 client for REST calls (needs httpx[http2])
+    "HTTP2_ENABLED": lambda: _flag("HTTP2_ENABLED"),
+
+    # Shared feed store written by the ingest worker (python -m services.ingest). When set,
+    # the web app only reads published feeds from it instead of calling upstreams itself.
+    "FEED_STORE_PATH": lambda: get_secret("FEED_STORE_PATH", required=False),
+    "INGEST_INTERVAL": lambda: int(get_secret("INGEST_INTERVAL", required=False) or 300),
+
+    # Where NewsAPI/GNews daily usage is persisted (survives restarts; shared by processes on one host)
+    "QUOTA_STORE_PATH": lambda: get_secret("QUOTA_STORE_PATH", required=False) or ".cache/quota.db",
+
+    # Re-send a NewsAPI/GNews request that hasn't answered after this many seconds
+    # (0 = off; each hedge can cost an extra quota call)
+    "HEDGE_AFTER_SECONDS": lambda: float(get_secret("HEDGE_AFTER_SECONDS", required=False) or 0),
+
+    # Read-only JSON API (services/api.py): port (0 = off), bind address and bearer token
+    # (required for user endpoints; when set, required everywhere)
+    "API_PORT": lambda: int(get_secret("API_PORT", required=False) or 0),
+    "API_HOST": lambda: get_secret("API_HOST", required=False) or "127.0.0.1",
+    "API_TOKEN": lambda: get_secret("API_TOKEN", required=False),
+
+    # Tracing: local Prometheus /metrics port (0 = off) and who sees the sidebar timing panel
+    "METRICS_PORT": lambda: int(get_secret("METRICS_PORT", required=False) or 0),
+    "ADMIN_EMAILS": lambda: [e.strip().lower() for e in (get_secret("ADMIN_EMAILS", required=False) or "").split(",") if e.strip()],
+}
+
+def __getattr__(name):
+    """Resolves a lazy setting once and caches it as a module global."""
+    if name in _LAZY_SETTINGS:
+        value = _LAZY_SETTINGS[name]()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Saved Articles Config
+BOOKMARKS_PER_PAGE = 10  # Bookmarks read from Firestore per page of the Saved view
+LISTENER_IDLE_TTL = 1800  # seconds without a rerun before a tab's hold on the live mirror lapses
+
+# Per-session UI state (utils/ui_state.py)
+UI_STATE_MAX_CATEGORIES = 4      # loaded category feeds kept per session (LRU)
+UI_STATE_MAX_ITEMS = 200         # per-card flags kept per view (LRU)
+UI_STATE_MAX_MB = 16             # approximate cap on a session's cached feeds
+
+# HTTP Config (shared pooled client for all REST calls)
+HTTP_CONNECT_TIMEOUT = 3.05  # seconds
+HTTP_READ_TIMEOUT = 10       # seconds
+HTTP_POOL_MAXSIZE = 10       # kept-alive connections per host
+
+# Per-source latency budgets (seconds): fetch_news returns whatever arrived in time
+NEWSAPI_BUDGET = 4
+GNEWS_BUDGET = 4
+RSS_FEED_BUDGET = 5          # each feed separately
+
+# Circuit breakers: skip a source after this many consecutive failures/budget misses,
+# then let one trial request through after the cool-down
+BREAKER_FAILURES = 3
+BREAKER_COOLDOWN = 300       # seconds
+
+# Daily API quotas (services/quota.py): each provider's requests are spread over the UTC day,
+# more often for popular categories
+NEWSAPI_DAILY_QUOTA = 100
+GNEWS_DAILY_QUOTA = 100
+QUOTA_COLD_RESERVE = 20          # requests a process with no cached response may not dip into
+QUOTA_BACKOFF = 900              # seconds paused after a rejection (doubles on repeats)
+
+# JSON API pages and feed cache (services/api.py)
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+API_FEED_TTL = 60                # seconds before a category feed is refreshed (incrementally)
+API_FEED_MAX_ITEMS = 200         # newest items kept per category
+
+# Ingest worker (services/ingest.py)
+FEED_CARRY_MAX_AGE = 6 * 3600    # seconds a failing feed's last items stay published
+
+# Summarization Config
+SUMMARY_INPUT_TOKENS = 400   # cap on article text sent to the LLM (approximate tokens)
+
+# Article bodies (services/article_fetcher.py): prefetched after each feed fetch
+ARTICLE_FETCH_WORKERS = 8        # concurrent downloads per process
+ARTICLE_HOST_CONCURRENCY = 2     # at most this many requests to one host at a time
+ARTICLE_HOST_INTERVAL = 0.25     # seconds between request starts to the same host
+ARTICLE_CACHE_SIZE = 1000        # extracted bodies kept in memory (LRU)
+ARTICLE_MAX_CHARS = 20000        # extracted text kept per article
+ARTICLE_CLICK_WAIT = 2.0         # seconds Summarize waits for a body still downloading
+
+# Card thumbnails (services/thumbnails.py)
+THUMB_SIZE = (240, 135)          # pixels (16:9, shown at half size for sharp HiDPI)
+THUMB_CACHE_DIR = "static/thumbnails"  # under the project's static/ folder, served at app/static/
+THUMB_CACHE_MAX_MB = 100         # oldest thumbnails are deleted past this
+
+# LLM routing (services/model_router.py): Groq models, smallest first
+GROQ_MODELS = ["llama-3.1-8b-instant", "llama-3.3-70b-versatile"]
+ROUTER_SHORT_INPUT_TOKENS = 150  # inputs up to this size start on the small model
+ROUTER_LATENCY_SLO = 4.0         # seconds; a model with a slower rolling p50 is demoted
+ROUTER_MAX_ERROR_RATE = 0.3      # a model failing more often than this (recent calls) is demoted
+ROUTER_MIN_CALLS = 5             # recent calls a model needs before its stats count
+LLM_TIMEOUT = 20                 # seconds per attempt before falling back to the next model
+
+# Translation (services/translator.py): target languages for audio summaries (gTTS codes)
+TRANSLATION_LANGUAGES = {"hi": "Hindi", "bn": "Bengali", "ta": "Tamil", "mr": "Marathi"}
+TRANSLATION_BATCH_TOKENS = 1200  # source text per request; output grows with each language
+TRANSLATION_CACHE_SIZE = 2000    # (text, language) translations kept in memory (LRU)
+
+# Audio (services/text_to_speech.py)
+TTS_CACHE_SIZE = 500             # synthesized speech chunks kept in memory (LRU)
 
 # News Config
 RSS_FEEDS = {
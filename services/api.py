@@ -0,0 +1,302 @@
+"""
+Read-only JSON API for other internal clients (mobile app, digest bots).
+
+    GET /api/v1/categories
+    GET /api/v1/feeds/<category>?limit=20&cursor=...
+    GET /api/v1/users/<user_id>/summaries?limit=20&cursor=...
+    GET /api/v1/users/<user_id>/bookmarks?limit=20&cursor=...
+
+Feeds come from get_news() (the ingest store, or the live fetcher with its quota
+scheduler, breakers and conditional GETs) and are refreshed incrementally at most every
+API_FEED_TTL seconds per category. User data is read through FirebaseManager (live
+mirrors when present).
+
+Every response carries an ETag, so a poll with If-None-Match gets an empty 304 when
+nothing changed. Bodies are gzipped for clients that accept it. Pages are cursor based:
+pass a response's `next_cursor` back as `cursor`.
+
+User endpoints need API_TOKEN, sent as "Authorization: Bearer <token>"; once it's set,
+every endpoint needs it.
+
+Served from a daemon thread next to the app when API_PORT is set, or standalone:
+    python -m services.api [--port 8601] [--host 127.0.0.1]
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import hmac
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from config import settings
+from config.settings import API_PAGE_SIZE, API_MAX_PAGE_SIZE, API_FEED_TTL, API_FEED_MAX_ITEMS
+from services.news_fetcher import (
+    canonical_key, get_available_categories, get_news, merge_news, newest_by_feed, published_key,
+)
+from services.resilience import single_flight
+
+API_PREFIX = "/api/v1"
+GZIP_MIN_BYTES = 512       # smaller bodies aren't worth compressing
+GZIP_CACHE_SIZE = 256      # compressed bodies kept by ETag, so repeated polls don't recompress
+
+_feeds = {}                # category -> {"items": [...], "keys": [(published, id)], "checked_at"}
+_feeds_lock = threading.Lock()
+_gzipped = OrderedDict()   # ETag -> gzipped body
+_gzip_lock = threading.Lock()
+_server = None
+_server_attempted = False
+_server_lock = threading.Lock()
+
+
+class ApiError(Exception):
+    """An error response (HTTP status + message)."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- Cursors ---
+
+def _encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if len(values) != 2 or not isinstance(values[1], str):
+            raise ValueError("cursor is (timestamp, id)")
+        return [datetime.fromisoformat(values[0]), values[1]]
+    except (ValueError, TypeError, IndexError):
+        raise ApiError(400, "invalid cursor")
+
+
+def _page_size(query):
+    try:
+        limit = int(query.get("limit", [API_PAGE_SIZE])[0])
+    except ValueError:
+        raise ApiError(400, "limit must be an integer")
+    return max(1, min(limit, API_MAX_PAGE_SIZE))
+
+
+# --- Feeds ---
+
+def _refresh_feed(category):
+    with _feeds_lock:
+        entry = _feeds.get(category)
+    if entry is None or not entry["items"]:
+        items, _ = merge_news([], get_news(category))  # Also drops duplicate links
+    else:
+        items, _ = merge_news(entry["items"], get_news(category, since=newest_by_feed(entry["items"])))
+
+    # Total order (publish time, id), newest first: cursors stay valid as new items arrive
+    keyed = sorted((((published_key(item), canonical_key(item)), item) for item in items),
+                   key=lambda pair: pair[0], reverse=True)[:API_FEED_MAX_ITEMS]
+    entry = {"items": [item for _, item in keyed], "keys": [key for key, _ in keyed],
+             "checked_at": time.monotonic()}
+    with _feeds_lock:
+        _feeds[category] = entry
+    return entry
+
+
+def _feed(category):
+    """The category's cached feed, refreshed (once, however many clients ask) when stale."""
+    with _feeds_lock:
+        entry = _feeds.get(category)
+    if entry is not None and time.monotonic() - entry["checked_at"] < API_FEED_TTL:
+        return entry
+    return single_flight("api.feed", category, lambda: _refresh_feed(category))
+
+
+def _feed_item(item, key):
+    return {
+        "id": key[1],
+        "title": item.get('title'),
+        "url": item.get('link'),
+        "published": item.get('published'),
+        "description": item.get('summary'),
+        "image": item.get('image'),
+        "source": item.get('source'),
+    }
+
+
+def feed_page(category, limit, cursor=None):
+    """{"items", "next_cursor"} for one page of a category feed."""
+    if category not in get_available_categories():
+        raise ApiError(404, f"unknown category '{category}'")
+    entry = _feed(category)
+    keys = entry["keys"]
+    start = 0
+    if cursor:
+        after = tuple(_decode_cursor(cursor))
+        start = next((i for i, key in enumerate(keys) if key < after), len(keys))
+    page = list(zip(entry["items"][start:start + limit], keys[start:start + limit]))
+    has_next = start + limit < len(keys)
+    return {
+        "category": category,
+        "items": [_feed_item(item, key) for item, key in page],
+        "next_cursor": _encode_cursor(page[-1][1]) if has_next and page else None,
+    }
+
+
+# --- User data ---
+
+def user_page(user_id, collection, limit, cursor=None):
+    """{"items", "next_cursor"} for one page of a user's summaries or bookmarks."""
+    from services.firebase_manager import FirebaseManager  # Lazy: pulls in the storage stack
+
+    manager = FirebaseManager()
+    start_after, start_after_id = _decode_cursor(cursor)[:2] if cursor else (None, None)
+    # Total order (timestamp, doc id), newest first: docs saved in the same instant aren't skipped
+    page_args = dict(page_size=limit + 1, start_after=start_after, start_after_id=start_after_id, with_ids=True)
+    if collection == "bookmarks":
+        docs, order_by = manager.get_bookmarks(user_id, **page_args), "saved_at"
+    else:
+        docs, order_by = manager.get_summaries(user_id, **page_args), "created_at"
+    docs = [(doc_id, doc) for doc_id, doc in docs if doc.get(order_by) is not None]  # Legacy docs can't be paged
+    has_next = len(docs) > limit
+    docs = docs[:limit]
+    return {
+        "items": [doc for _, doc in docs],
+        "next_cursor": _encode_cursor([docs[-1][1][order_by], docs[-1][0]]) if has_next else None,
+    }
+
+
+# --- HTTP ---
+
+def _authorized(headers):
+    token = settings.API_TOKEN
+    supplied = (headers.get("Authorization") or "").removeprefix("Bearer ").strip()
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def _route(path, query, headers):
+    """Returns (payload, Cache-Control) for a GET, or raises ApiError."""
+    parts = [unquote(p) for p in path[len(API_PREFIX):].strip("/").split("/")] if path.startswith(API_PREFIX) else []
+    user_endpoint = parts[:1] == ["users"]
+    if (settings.API_TOKEN or user_endpoint) and not _authorized(headers):
+        raise ApiError(401 if settings.API_TOKEN else 403,
+                       "missing or wrong API token" if settings.API_TOKEN else "user endpoints need API_TOKEN")
+
+    if parts == ["categories"]:
+        return {"categories": get_available_categories()}, "public, max-age=3600"
+    if len(parts) == 2 and parts[0] == "feeds":
+        return feed_page(parts[1], _page_size(query), query.get("cursor", [None])[0]), "public, no-cache"
+    if len(parts) == 3 and user_endpoint and parts[2] in ("summaries", "bookmarks"):
+        return user_page(parts[1], parts[2], _page_size(query), query.get("cursor", [None])[0]), "private, no-cache"
+    raise ApiError(404, "not found")
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _gzip(etag, body):
+    with _gzip_lock:
+        if etag in _gzipped:
+            _gzipped.move_to_end(etag)
+            return _gzipped[etag]
+    compressed = gzip.compress(body, compresslevel=6)
+    with _gzip_lock:
+        _gzipped[etag] = compressed
+        while len(_gzipped) > GZIP_CACHE_SIZE:
+            _gzipped.popitem(last=False)
+    return compressed
+
+
+def handle(target, headers):
+    """
+    Serves one GET. target: request path with query string; headers: request headers.
+    Returns (status, response headers, body bytes).
+    """
+    url = urlsplit(target)
+    try:
+        payload, cache_control = _route(url.path.rstrip("/"), parse_qs(url.query), headers)
+        status = 200
+    except ApiError as e:
+        payload, cache_control, status = {"error": str(e)}, "no-store", e.status
+    except Exception as e:
+        print(f"API error for {target}: {e}")
+        payload, cache_control, status = {"error": "internal error"}, "no-store", 500
+
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+    response_headers = {
+        "Content-Type": "application/json; charset=utf-8",
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding, Authorization",
+    }
+    if status != 200:
+        return status, response_headers, body
+
+    # Weak ETag: identifies the JSON content whatever the transfer encoding
+    etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+    response_headers["ETag"] = etag
+    if_none_match = headers.get("If-None-Match") or ""
+    if if_none_match.strip() == "*" or etag[2:] in (t.strip().removeprefix("W/") for t in if_none_match.split(",")):
+        del response_headers["Content-Type"]
+        return 304, response_headers, b""
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in (headers.get("Accept-Encoding") or ""):
+        response_headers["Content-Encoding"] = "gzip"
+        body = _gzip(etag, body)
+    return 200, response_headers, body
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for polling clients
+
+    def do_GET(self):
+        status, headers, body = handle(self.path, self.headers)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep polls out of the app log
+
+
+def start_api_server(port, host="127.0.0.1"):
+    """Serves the API on host:port from a daemon thread (once per process; port 0/None = off)."""
+    global _server, _server_attempted
+    if not port:
+        return None
+    with _server_lock:
+        if not _server_attempted:
+            _server_attempted = True  # One try per process, so a taken port doesn't log every rerun
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), _ApiHandler)
+            except OSError as e:
+                print(f"API not started on {host}:{port}: {e}")
+                return None
+            threading.Thread(target=_server.serve_forever, name="json-api", daemon=True).start()
+    return _server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, help="port (default: API_PORT, else 8601)")
+    parser.add_argument("--host", help="bind address (default: API_HOST)")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host or settings.API_HOST, args.port or settings.API_PORT or 8601), _ApiHandler)
+    print(f"PulseAI API on http://{server.server_address[0]}:{server.server_address[1]}{API_PREFIX}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
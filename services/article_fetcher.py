@@ -0,0 +1,166 @@
+"""
+Full-article body fetcher (prefetch stage after fetch_news).
+
+Feeds only carry a one-line description, so summaries made from it tend to restate the
+headline. prefetch(items) downloads the linked pages in the background:
+- bounded pool (ARTICLE_FETCH_WORKERS) and per-host politeness: at most
+  ARTICLE_HOST_CONCURRENCY requests per host at once, ARTICLE_HOST_INTERVAL seconds apart
+- readability-style extraction: drop navigation/boilerplate, then keep the paragraphs of
+  the element with the most paragraph text
+- in-process LRU cache keyed by canonical_key (failures are cached as "" so dead links
+  aren't retried on every rerun)
+
+By the time someone clicks Summarize, get_body() usually returns instantly.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from config.settings import (
+    HTTP_CONNECT_TIMEOUT, ARTICLE_FETCH_WORKERS, ARTICLE_HOST_CONCURRENCY, ARTICLE_HOST_INTERVAL,
+    ARTICLE_CACHE_SIZE, ARTICLE_MAX_CHARS,
+)
+from services.news_fetcher import canonical_key
+from utils.tracing import traced
+
+ARTICLE_READ_TIMEOUT = 8           # seconds
+MAX_PAGE_BYTES = 3 * 1024 * 1024   # stop downloading (and skip) anything bigger
+MIN_PARAGRAPH_CHARS = 40
+
+_DROP_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form",
+              "figure", "iframe", "svg", "button", "template"]
+# Matched against whole class/id tokens: the token is the word or starts with it plus -/_
+# ("nav", "comments-area", "share_bar"), so "has-sidebar", "commentary" or "navigation-aware" stay
+_BOILERPLATE_ATTR = re.compile(
+    r"(comments?|share|social|promo|related|newsletter|subscribe|advert(isement)?|ads?|sponsor(ed)?|cookies?"
+    r"|byline|breadcrumbs?|sidebar|footer|nav)([-_]\S*)?",
+    re.IGNORECASE,
+)
+
+_executor = ThreadPoolExecutor(max_workers=ARTICLE_FETCH_WORKERS, thread_name_prefix="article-fetch")
+_cache = OrderedDict()   # canonical key -> body text ("" = nothing usable)
+_inflight = {}           # canonical key -> Future
+_lock = threading.Lock()
+
+_hosts = {}              # host -> (BoundedSemaphore, [last request start])
+_hosts_lock = threading.Lock()
+
+
+class _HostSlot:
+    """Per-host politeness: limited concurrency and a minimum gap between request starts."""
+
+    def __init__(self, host):
+        with _hosts_lock:
+            if host not in _hosts:
+                _hosts[host] = (threading.BoundedSemaphore(ARTICLE_HOST_CONCURRENCY), [0.0], threading.Lock())
+            self._semaphore, self._last, self._gap_lock = _hosts[host]
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        with self._gap_lock:
+            delay = self._last[0] + ARTICLE_HOST_INTERVAL - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._last[0] = time.monotonic()
+
+    def __exit__(self, *exc):
+        self._semaphore.release()
+
+
+def extract_main_text(html):
+    """Readability-style main text: paragraphs of the densest content block, boilerplate removed."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(_DROP_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(True):
+        if tag.decomposed or tag.name in ("html", "body", "article", "main"):
+            continue
+        tokens = [*(tag.get("class") or []), *(tag.get("id") or "").split()]
+        if any(_BOILERPLATE_ATTR.fullmatch(token) for token in tokens):
+            tag.decompose()
+
+    # Score each paragraph's parent by the text it holds (commas ~ real prose)
+    scores, parents = {}, {}
+    for p in soup.find_all("p"):
+        text = p.get_text(" ", strip=True)
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        parent = p.parent
+        parents[id(parent)] = parent
+        scores[id(parent)] = scores.get(id(parent), 0) + len(text) + 10 * text.count(",")
+    if not scores:
+        return ""
+
+    root = parents[max(scores, key=scores.get)]
+    paragraphs = [p.get_text(" ", strip=True) for p in root.find_all("p")]
+    text = "\n\n".join(re.sub(r"\s+", " ", p) for p in paragraphs if len(p) >= MIN_PARAGRAPH_CHARS)
+    return text[:ARTICLE_MAX_CHARS]
+
+
+@traced("article.fetch")
+def _download_and_extract(url):
+    from services.http_client import http_get_limited
+
+    with _HostSlot(urlsplit(url).netloc.lower()):
+        response, body = http_get_limited(url, MAX_PAGE_BYTES, timeout=(HTTP_CONNECT_TIMEOUT, ARTICLE_READ_TIMEOUT))
+    response.raise_for_status()
+    if "html" not in response.headers.get("Content-Type", "text/html") or body is None:
+        return ""
+    return extract_main_text(body)
+
+
+def _fetch(key, url):
+    try:
+        body = _download_and_extract(url)
+    except Exception as e:
+        print(f"Error fetching article body {url}: {e}")
+        body = ""
+    with _lock:
+        _cache[key] = body
+        _cache.move_to_end(key)
+        while len(_cache) > ARTICLE_CACHE_SIZE:
+            _cache.popitem(last=False)
+        _inflight.pop(key, None)
+    return body
+
+
+def _fetchable(item):
+    return (item.get('link') or '').startswith(("http://", "https://"))
+
+
+def prefetch(items):
+    """Starts background downloads for articles not cached or in flight. Returns immediately."""
+    with _lock:
+        for item in items:
+            if not _fetchable(item):
+                continue
+            key = canonical_key(item)
+            if key in _cache or key in _inflight:
+                continue
+            _inflight[key] = _executor.submit(_fetch, key, item['link'])
+
+
+def get_body(item, wait_seconds=0):
+    """
+    Returns the article's extracted body, or None if it isn't available (yet).
+    Starts a fetch if needed and waits up to `wait_seconds` for it.
+    """
+    if not _fetchable(item):
+        return None
+    key = canonical_key(item)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key] or None
+    prefetch([item])
+    with _lock:
+        future = _inflight.get(key)
+    if future is not None and wait_seconds > 0:
+        wait([future], timeout=wait_seconds)
+    with _lock:
+        return _cache.get(key) or None
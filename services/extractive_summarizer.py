@@ -0,0 +1,75 @@
+"""
+Local extractive summarizer (TextRank) - no network, a few milliseconds per article.
+
+Used as the instant preview while the LLM works, and as the summary itself when Groq is
+missing, slow or failing. Sentences are TF-IDF vectors; PageRank runs over their cosine
+similarity matrix, teleporting towards sentences that resemble the title, and the best
+sentences are returned in their original order.
+"""
+import re
+from collections import Counter
+
+import numpy as np
+
+from services.ranking import tokenize
+
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-5
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+
+
+def split_sentences(text):
+    """Splits text into sentences (period/!/? followed by a capitalized word)."""
+    return [s.strip() for s in _SENTENCE_SPLIT.split(re.sub(r"\s+", " ", text or "").strip()) if s.strip()]
+
+
+def _sentence_vectors(token_lists):
+    vocab = {}
+    rows = [Counter(vocab.setdefault(t, len(vocab)) for t in tokens) for tokens in token_lists]
+    matrix = np.zeros((len(rows), max(len(vocab), 1)), np.float32)
+    for i, counts in enumerate(rows):
+        if counts:
+            matrix[i, list(counts)] = 1 + np.log(np.fromiter(counts.values(), np.float32))
+    df = np.count_nonzero(matrix, axis=0)
+    matrix *= np.log((1 + len(rows)) / (1 + df)) + 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0), vocab
+
+
+def summarize_extractive(text, max_sentences=2, title=None):
+    """
+    Returns the `max_sentences` most central sentences of `text` in original order.
+    title: excluded from the output and used to bias the ranking towards the story's topic.
+    """
+    sentences = split_sentences(text)
+    if title:
+        title_key = title.strip().rstrip(".").lower()
+        sentences = [s for s in sentences if s.rstrip(".").lower() != title_key]
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    vectors, _ = _sentence_vectors([tokenize(s) for s in sentences] + [tokenize(title or "")])
+    vectors, title_vector = vectors[:-1], vectors[-1]
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    n = len(sentences)
+    transition = np.divide(similarity, row_sums, out=np.full_like(similarity, 1.0 / n), where=row_sums > 0)
+
+    # Teleport: towards the title if it shares words, plus a mild lead bias (news puts facts first)
+    teleport = 1.0 / (1 + np.arange(n, dtype=np.float32)) + np.maximum(vectors @ title_vector, 0) * 2
+    teleport /= teleport.sum()
+
+    scores = np.full(n, 1.0 / n, np.float32)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) * teleport + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            scores = updated
+            break
+        scores = updated
+
+    chosen = sorted(np.argsort(-scores, kind="stable")[:max_sentences])
+    return " ".join(sentences[i] for i in chosen)
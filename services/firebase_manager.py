@@ -1,25 +1,67 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
 import hashlib
-from datetime import datetime
+import itertools
+from datetime import datetime, timezone
 import streamlit as st
 import os
+import queue
+import threading
+import time
 
-import requests
-from config.settings import FIREBASE_WEB_API_KEY
+from config import settings
+from services.storage import create_storage, MemoryStorage
+from utils.tracing import traced
 
 class FirebaseManager:
     _instance = None
     _db = None
+    _backend = None
+    _initialized = False
+    _init_lock = threading.Lock()
+    _write_queue = None
+    _write_lock = threading.Lock()
+    _pending_writes = {}     # (user_id, doc_id) -> version of its latest queued, uncommitted save
+    _write_versions = itertools.count(1)
+    _failed_writes = {}      # user_id -> titles of queued saves that failed (see pop_failed_writes)
+    _mirrors = {}            # user_id -> MemoryStorage kept in sync by snapshot listeners
+    _watches = {}            # user_id -> [watch handles]
+    _sessions = {}           # user_id -> {session_id: last seen (monotonic)} holding the listeners
+    _mirror_ready = set()    # (user_id, collection) that received their initial snapshot
+    _mirror_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(FirebaseManager, cls).__new__(cls)
-            cls._instance._initialize()
         return cls._instance
 
+    @property
+    def _store(self):
+        """Storage backend, initialized on first data access so login and cold start skip it."""
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self._initialize()
+                    self._initialized = True
+        return self._backend
+
     def _initialize(self):
+        """Initializes the configured storage backend (Firestore unless STORAGE_BACKEND says otherwise)."""
+        backend = settings.STORAGE_BACKEND
+        if backend != "firestore":
+            try:
+                self._backend = create_storage(backend, sqlite_path=settings.SQLITE_DB_PATH)
+            except Exception as e:
+                st.error(f"Error initializing {backend} storage: {e}")
+            return
+
+        self._init_firestore()
+        if self._db:
+            self._backend = create_storage("firestore", firestore_client=self._db)
+
+    def _init_firestore(self):
         """Initializes Firebase app if not already initialized."""
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
         if not firebase_admin._apps:
             try:
                 cred = None
@@ -71,20 +113,23 @@ class FirebaseManager:
         return hashlib.md5(text.encode('utf-8')).hexdigest()
 
     # --- Authentication Methods ---
+    @traced("firebase.login_user")
     def login_user(self, email, password):
         """Logs in a user using Firebase Auth REST API."""
-        if not FIREBASE_WEB_API_KEY:
+        from services.http_client import http_post, HTTP_STATUS_ERRORS
+
+        if not settings.FIREBASE_WEB_API_KEY:
             st.error("Missing FIREBASE_WEB_API_KEY. Add it to .env (local) or Streamlit Secrets (cloud).")
             return None
             
-        url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={FIREBASE_WEB_API_KEY}"
+        url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={settings.FIREBASE_WEB_API_KEY}"
         payload = {"email": email, "password": password, "returnSecureToken": True}
         
         try:
-            r = requests.post(url, json=payload)
+            r = http_post(url, json=payload)
             r.raise_for_status()
             return r.json() # Contains idToken, email, localId (uid)
-        except requests.exceptions.HTTPError as e:
+        except HTTP_STATUS_ERRORS as e:
             try:
                 error_msg = e.response.json().get('error', {}).get('message', str(e))
                 st.error(f"Login Failed: {error_msg}")
@@ -95,20 +140,23 @@ class FirebaseManager:
             st.error(f"An unexpected error occurred: {e}")
             return None
 
+    @traced("firebase.signup_user")
     def signup_user(self, email, password):
         """Signs up a new user using Firebase Auth REST API."""
-        if not FIREBASE_WEB_API_KEY:
+        from services.http_client import http_post, HTTP_STATUS_ERRORS
+
+        if not settings.FIREBASE_WEB_API_KEY:
             st.error("Missing FIREBASE_WEB_API_KEY. Add it to .env (local) or Streamlit Secrets (cloud).")
             return None
 
-        url = f"https://identitytoolkit.googleapis.com/v1/accounts:signUp?key={FIREBASE_WEB_API_KEY}"
+        url = f"https://identitytoolkit.googleapis.com/v1/accounts:signUp?key={settings.FIREBASE_WEB_API_KEY}"
         payload = {"email": email, "password": password, "returnSecureToken": True}
         
         try:
-            r = requests.post(url, json=payload)
+            r = http_post(url, json=payload)
             r.raise_for_status()
             return r.json()
-        except requests.exceptions.HTTPError as e:
+        except HTTP_STATUS_ERRORS as e:
             try:
                 error_msg = e.response.json().get('error', {}).get('message', str(e))
                 st.error(f"Signup Failed: {error_msg}")
@@ -119,6 +167,106 @@ class FirebaseManager:
             st.error(f"An unexpected error occurred: {e}")
             return None
 
+    # --- Real-time Mirror ---
+
+    def start_listeners(self, user_id, session_id=None):
+        """
+        Registers snapshot listeners on the user's summaries and bookmarks (once per user).
+        Reads are then served from an in-memory mirror, and changes made from other tabs
+        or devices arrive through the listeners. No-op for backends without watch support.
+
+        Each session (browser tab) holding the listeners calls this on every rerun; the
+        listeners stop once every holder has released them or gone idle for
+        LISTENER_IDLE_TTL seconds (closed tabs never log out).
+        """
+        if not settings.REALTIME_LISTENERS or not user_id or not hasattr(self._store, 'watch'):
+            return
+        now = time.monotonic()
+        with self._mirror_lock:
+            self._sessions.setdefault(user_id, {})[session_id] = now
+            expired = self._expire_sessions(now)
+            started = user_id in self._watches
+            if not started:
+                self._mirrors[user_id] = MemoryStorage()
+                self._watches[user_id] = []
+        for idle_user in expired:
+            self.stop_listeners(idle_user)
+        if started:
+            return
+        try:
+            for collection in ('summaries', 'bookmarks'):
+                watch = self._store.watch(user_id, collection, self._make_listener(user_id, collection))
+                self._watches[user_id].append(watch)
+        except Exception as e:
+            print(f"Error starting listeners: {e}")
+            self.stop_listeners(user_id)
+
+    def release_listeners(self, user_id, session_id=None):
+        """Drops one session's hold on the user's listeners; the last holder stops them."""
+        with self._mirror_lock:
+            sessions = self._sessions.get(user_id, {})
+            sessions.pop(session_id, None)
+            if sessions:
+                return
+        self.stop_listeners(user_id)
+
+    def _expire_sessions(self, now):
+        """Forgets sessions idle past LISTENER_IDLE_TTL; returns users left with no holder. Call under _mirror_lock."""
+        idle_users = []
+        for user_id, sessions in list(self._sessions.items()):
+            for session_id, seen in list(sessions.items()):
+                if now - seen > settings.LISTENER_IDLE_TTL:
+                    del sessions[session_id]
+            if not sessions:
+                del self._sessions[user_id]
+                idle_users.append(user_id)
+        return idle_users
+
+    def stop_listeners(self, user_id):
+        """Unsubscribes the user's listeners and drops the mirror (for every session)."""
+        with self._mirror_lock:
+            self._sessions.pop(user_id, None)
+            watches = self._watches.pop(user_id, [])
+            self._mirrors.pop(user_id, None)
+            self._mirror_ready.difference_update({(user_id, 'summaries'), (user_id, 'bookmarks')})
+        for watch in watches:
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                print(f"Error stopping listener: {e}")
+
+    def _make_listener(self, user_id, collection):
+        """Builds the snapshot callback that applies changes to the user's mirror."""
+        def on_changes(changes):
+            mirror = self._mirrors.get(user_id)
+            if mirror is None:
+                return
+            for doc_id, data in changes:
+                if data is None:
+                    mirror.delete(user_id, collection, doc_id)
+                else:
+                    mirror.set(user_id, collection, doc_id, data)
+            self._mirror_ready.add((user_id, collection))
+        return on_changes
+
+    def is_mirrored(self, user_id, collection='bookmarks'):
+        """True when reads of this collection are served from the live mirror."""
+        return (user_id, collection) in self._mirror_ready
+
+    def _reader(self, user_id, collection):
+        """Storage to read from: the live mirror once loaded, else the backend."""
+        if (user_id, collection) in self._mirror_ready:
+            mirror = self._mirrors.get(user_id)
+            if mirror is not None:
+                return mirror
+        return self._store
+
+    def _mirror_writes(self, user_id, writes):
+        """Applies our own writes to the mirror right away (listeners confirm them later)."""
+        mirror = self._mirrors.get(user_id)
+        if mirror is not None:
+            mirror.set_many(user_id, writes)
+
     # --- DATA Methods (User Scoped) ---
 
     def get_category_feed(self, category, limit=20):
@@ -142,130 +290,274 @@ class FirebaseManager:
         # The prompt says "Store all user activities... summaries... under that UID only".
         # So I will scope summaries to user.
 
+    @traced("firebase.get_user_summaries_feed")
     def get_user_summaries_feed(self, user_id, category, limit=20):
         """Retrieves user's own generated summaries for a category."""
-        if not self._db or not user_id: return []
+        if not self._store or not user_id: return []
         try:
-            feed = []
-            docs = self._db.collection('users').document(user_id).collection('summaries')\
-                .where('category', '==', category)\
-                .order_by('created_at', direction=firestore.Query.DESCENDING)\
-                .limit(limit)\
-                .stream()
-            for doc in docs:
-                feed.append(doc.to_dict())
-            return feed
+            return self._reader(user_id, 'summaries').query(user_id, 'summaries', 'created_at', limit=limit, filters={'category': category})
         except Exception as e:
             # print(f"Error fetching filtered feed: {e}")
             return []
 
+    @traced("firebase.get_recent_summaries")
+    def get_recent_summaries(self, user_id, limit=50):
+        """Retrieves the user's most recent summaries across all categories (for ranking)."""
+        if not self._store or not user_id: return []
+        try:
+            return self._reader(user_id, 'summaries').query(user_id, 'summaries', 'created_at', limit=limit)
+        except Exception as e:
+            print(f"Error fetching recent summaries: {e}")
+            return []
+
+    @traced("firebase.get_summaries")
+    def get_summaries(self, user_id, page_size=None, start_after=None, start_after_id=None, with_ids=False):
+        """
+        Get the user's summaries, newest first (paged like get_bookmarks).
+        start_after is the 'created_at' value of the last summary of the previous page.
+        """
+        if not self._store or not user_id: return []
+        try:
+            return self._reader(user_id, 'summaries').query(user_id, 'summaries', 'created_at', limit=page_size, start_after=start_after,
+                                                            start_after_id=start_after_id, with_ids=with_ids)
+        except Exception as e:
+            print(f"Error fetching summaries: {e}")
+            return []
+
+    @traced("firebase.get_summary")
     def get_summary(self, article_url, user_id):
-        """Retrieves cached summary from User's Firestore."""
-        if not self._db or not user_id: return None
+        """Retrieves cached summary from User's storage."""
+        if not self._store or not user_id: return None
         
         try:
             doc_id = self._get_hash(article_url)
             # Scoped to User
-            doc_ref = self._db.collection('users').document(user_id).collection('summaries').document(doc_id)
-            doc = doc_ref.get()
-            
-            if doc.exists:
-                return doc.to_dict().get('summary')
-            return None
+            doc = self._reader(user_id, 'summaries').get(user_id, 'summaries', doc_id)
+            return doc.get('summary') if doc else None
         except Exception as e:
             print(f"Error fetching summary: {e}")
             return None
 
+    @traced("firebase.save_summary")
     def save_summary(self, article_data, summary, category, user_id):
-        """Saves generated summary to User's Firestore."""
-        if not self._db:
+        """Saves generated summary to User's storage."""
+        if not self._store:
             st.error("Database connection not initialized. Cannot save summary.")
             return False
         if not user_id: return False
+        if not self._is_cacheable_summary(summary):
+            print(f"Not caching unusable summary for {article_data.get('link')}")
+            return False
         
         try:
             doc_id = self._get_hash(article_data['link'])
-            data = {
-                'url': article_data['link'],
-                'title': article_data.get('title'),
-                'summary': summary,
-                'category': category,
-                'source': article_data.get('source'),
-                'published': article_data.get('published'),
-                'image': article_data.get('image'),
-                'created_at': datetime.now()
-            }
+            data = self._summary_doc(article_data, summary, category)
             # Scoped to User
-            self._db.collection('users').document(user_id).collection('summaries').document(doc_id).set(data)
+            self._store.set(user_id, 'summaries', doc_id, data)
+            self._mirror_writes(user_id, [('summaries', doc_id, data)])
             return True
         except Exception as e:
             st.error(f"Error saving summary to database: {e}")
             return False
 
+    @traced("firebase.save_bookmark")
     def save_bookmark(self, article_data, user_id):
         """Save article to User's bookmarks."""
-        if not self._db:
+        if not self._store:
             st.error("Database connection not initialized. Cannot save bookmark.")
             return False
         if not user_id: return False
         
         try:
             doc_id = self._get_hash(article_data['link'])
-            data = {
-                'title': article_data.get('title'),
-                'url': article_data.get('link'),
-                'source': article_data.get('source'),
-                'published': article_data.get('published'),
-                'image': article_data.get('image'),
-                'summary': article_data.get('summary'),
-                'saved_at': datetime.now()
-            }
+            data = self._bookmark_doc(article_data, article_data.get('summary'))
             # Scoped to User
-            self._db.collection('users').document(user_id).collection('bookmarks').document(doc_id).set(data)
+            self._store.set(user_id, 'bookmarks', doc_id, data)
+            self._mirror_writes(user_id, [('bookmarks', doc_id, data)])
             return True
         except Exception as e:
             st.error(f"Error bookmarking: {e}")
             return False
 
+    @traced("firebase.save_article")
+    def save_article(self, article_data, summary, category, user_id, wait=None, cache_summary=True):
+        """
+        Saves the summary and the bookmark for an article in one atomic write
+        (a WriteBatch on Firestore, a single transaction on SQLite).
+        
+        With wait=False (default: not WRITE_BEHIND_SAVES) the write is handed to a
+        background writer and this returns before the backend acknowledges it.
+        cache_summary=False (e.g. a local fallback summary) writes only the bookmark,
+        so the summaries cache doesn't block a later LLM summary.
+        """
+        if not self._store:
+            st.error("Database connection not initialized. Cannot save article.")
+            return False
+        if not user_id: return False
+        if wait is None:
+            wait = not settings.WRITE_BEHIND_SAVES
+        
+        try:
+            doc_id = self._get_hash(article_data['link'])
+            writes = [('bookmarks', doc_id, self._bookmark_doc(article_data, summary))]
+            if cache_summary and self._is_cacheable_summary(summary):
+                writes.insert(0, ('summaries', doc_id, self._summary_doc(article_data, summary, category)))
+            if wait:
+                self._store.set_many(user_id, writes)
+            else:
+                self._enqueue_write(user_id, writes, (user_id, doc_id))
+            self._mirror_writes(user_id, writes)
+            return True
+        except Exception as e:
+            st.error(f"Error saving article: {e}")
+            return False
+
+    @staticmethod
+    def _is_cacheable_summary(summary):
+        """
+        False for empty summaries. Failed or local summaries are kept out by the caller via the
+        summarizer's from_llm flag (cache_summary=False), never by looking at the text.
+        """
+        return bool(summary and summary.strip())
+
+    def _summary_doc(self, article_data, summary, category):
+        """Builds the 'summaries' document for an article."""
+        return {
+            'url': article_data['link'],
+            'title': article_data.get('title'),
+            'summary': summary,
+            'category': category,
+            'source': article_data.get('source'),
+            'published': article_data.get('published'),
+            'image': article_data.get('image'),
+            'created_at': datetime.now(timezone.utc)  # Aware, so mirror docs sort alongside Firestore timestamps
+        }
+
+    def _bookmark_doc(self, article_data, summary):
+        """Builds the 'bookmarks' document for an article."""
+        return {
+            'title': article_data.get('title'),
+            'url': article_data.get('link'),
+            'source': article_data.get('source'),
+            'published': article_data.get('published'),
+            'image': article_data.get('image'),
+            'summary': summary,
+            'saved_at': datetime.now(timezone.utc)
+        }
+
+    # --- Write-behind Queue ---
+
+    def _enqueue_write(self, user_id, writes, key):
+        """Queues a set_many for the background writer thread (started on first use)."""
+        with self._write_lock:
+            if FirebaseManager._write_queue is None:
+                FirebaseManager._write_queue = queue.Queue()
+                threading.Thread(target=self._write_worker, name="storage-write-behind", daemon=True).start()
+            version = next(self._write_versions)
+            self._pending_writes[key] = version
+        self._write_queue.put((user_id, writes, key, version))
+
+    def _write_worker(self):
+        """Commits queued writes in order. Errors are logged, the UI has already moved on."""
+        while True:
+            user_id, writes, key, version = self._write_queue.get()
+            try:
+                self._store.set_many(user_id, writes)
+            except Exception as e:
+                print(f"Error committing queued write {key}: {e}")
+                with self._write_lock:
+                    latest = self._pending_writes.get(key) == version
+                    title = next((data.get('title') or data.get('url') for _, _, data in writes), None)
+                    self._failed_writes.setdefault(user_id, []).append(title or "article")
+                if latest:  # A newer queued save of the doc owns the mirror entry now
+                    self._restore_mirror(user_id, writes)
+            finally:
+                with self._write_lock:
+                    # A newer save of the same doc queued meanwhile stays pending
+                    if self._pending_writes.get(key) == version:
+                        del self._pending_writes[key]
+                self._write_queue.task_done()
+
+    def _restore_mirror(self, user_id, writes):
+        """Resets mirror entries of a failed write to what the store actually holds."""
+        mirror = self._mirrors.get(user_id)
+        if mirror is None:
+            return
+        for collection, doc_id, _ in writes:
+            try:
+                data = self._store.get(user_id, collection, doc_id)
+            except Exception:
+                data = None  # Store unreachable: rather miss a save than show one that didn't happen
+            if data is None:
+                mirror.delete(user_id, collection, doc_id)
+            else:
+                mirror.set(user_id, collection, doc_id, data)
+
+    def pop_failed_writes(self, user_id):
+        """Titles of the user's background saves that failed since the last call."""
+        with self._write_lock:
+            return self._failed_writes.pop(user_id, [])
+
+    def flush_writes(self):
+        """Blocks until every queued write has been committed."""
+        if self._write_queue is not None:
+            self._write_queue.join()
+
+    @traced("firebase.remove_bookmark")
     def remove_bookmark(self, article_url, user_id):
         """Remove article from User's bookmarks."""
-        if not self._db:
+        if not self._store:
              st.error("Database connection not initialized.")
              return False
         if not user_id: return False
         
         try:
             doc_id = self._get_hash(article_url)
+            if (user_id, doc_id) in self._pending_writes:
+                # A queued save of this article would commit after the delete and bring it back
+                self.flush_writes()
             # Scoped to User
-            self._db.collection('users').document(user_id).collection('bookmarks').document(doc_id).delete()
+            self._store.delete(user_id, 'bookmarks', doc_id)
+            with self._write_lock:
+                self._pending_writes.pop((user_id, doc_id), None)
+            mirror = self._mirrors.get(user_id)
+            if mirror is not None:
+                mirror.delete(user_id, 'bookmarks', doc_id)
             return True
         except Exception as e:
             st.error(f"Error removing bookmark: {e}")
             return False
             
-    def get_bookmarks(self, user_id):
-        """Get all bookmarked articles for User."""
-        if not self._db or not user_id: return []
+    @traced("firebase.get_bookmarks")
+    def get_bookmarks(self, user_id, page_size=None, start_after=None, start_after_id=None, with_ids=False):
+        """
+        Get bookmarked articles for User, newest first.
+        
+        page_size limits how many documents are read (None = all).
+        start_after is the 'saved_at' value of the last bookmark of the previous page;
+        start_after_id (its doc id) also resumes correctly among equal timestamps.
+        with_ids returns [(doc_id, data)].
+        """
+        if not self._store or not user_id: return []
         
         try:
-            bookmarks = []
             # Scoped to User
-            docs = self._db.collection('users').document(user_id).collection('bookmarks').order_by('saved_at', direction=firestore.Query.DESCENDING).stream()
-            for doc in docs:
-                bookmarks.append(doc.to_dict())
-            return bookmarks
+            return self._reader(user_id, 'bookmarks').query(user_id, 'bookmarks', 'saved_at', limit=page_size, start_after=start_after,
+                                                            start_after_id=start_after_id, with_ids=with_ids)
         except Exception as e:
             print(f"Error fetching bookmarks: {e}")
             return []
 
+    @traced("firebase.is_bookmarked")
     def is_bookmarked(self, article_url, user_id):
         """Check if an article is already bookmarked by User."""
-        if not self._db or not user_id: return False
+        if not self._store or not user_id: return False
         
         try:
             doc_id = self._get_hash(article_url)
+            if (user_id, doc_id) in self._pending_writes:
+                return True
             # Scoped to User
-            doc = self._db.collection('users').document(user_id).collection('bookmarks').document(doc_id).get()
-            return doc.exists
+            return self._reader(user_id, 'bookmarks').get(user_id, 'bookmarks', doc_id) is not None
         except Exception as e:
             return False
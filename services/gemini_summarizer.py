@@ -39,35 +39,38 @@
 
 
 # NEW GROQ IMPLEMENTATION
-from groq import Groq
-from config.settings import GROQ_API_KEY
+from config import settings
+from services.extractive_summarizer import summarize_extractive
+from services.model_router import complete
+from services.resilience import single_flight
+from utils.compaction import estimate_tokens
+from utils.tracing import traced
 
-def summarize_text(text):
+@traced("groq.summarize")
+def _summarize_groq(text):
+    """Summarizes the given text using Groq API (model picked by the router). Raises on any failure."""
+    prompt = f"Summarize the following news article in 2-3 concise sentences. Focus on the main facts:\n\n{text}"
+    content, _ = complete(prompt, task="summarize", input_tokens=estimate_tokens(text))
+    return content
+
+def summarize(text, title=None):
     """
-    Summarizes the given text using Groq API.
+    Summarizes text with Groq, falling back to the local extractive summarizer when Groq is
+    unavailable or fails. Returns (summary, from_llm); only LLM summaries should be cached,
+    so a later attempt can still get one.
     """
-    if not GROQ_API_KEY:
-        return "Error: Missing GROQ_API_KEY. Add it to .env (local) or Streamlit Secrets (cloud)."
-
     try:
-        # Initialize the Groq client
-        client = Groq(api_key=GROQ_API_KEY)
-        
-        prompt = f"Summarize the following news article in 2-3 concise sentences. Focus on the main facts:\n\n{text}"
-        
-        # Create chat completion
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
-            model="llama-3.3-70b-versatile",  # Using Llama 3.3 70B model
-        )
-        
-        # Return the response
-        return chat_completion.choices[0].message.content
-
+        if not settings.GROQ_API_KEY:
+            raise ValueError("missing GROQ_API_KEY")
+        # Sessions summarizing the same article at once share one Groq call
+        return single_flight("summarize", text, lambda: _summarize_groq(text)), True
     except Exception as e:
-        return f"Error generating summary with Groq: {str(e)}"
+        print(f"Groq summarization failed, using extractive summary: {e}")
+        return summarize_extractive(text, title=title), False
+
+def summarize_text(text):
+    """
+    Summarizes the given text using Groq API.
+    Falls back to an extractive summary instead of returning an error message.
+    """
+    return summarize(text)[0]
@@ -0,0 +1,119 @@
+"""
+Shared HTTP client for every outbound REST call (news APIs, RSS feeds, Firebase Auth).
+
+One process-wide client keeps per-host connection pools alive between calls, so
+repeat fetches skip the TCP+TLS handshake. All calls get connect/read timeouts.
+
+By default this is a requests.Session (its urllib3 pools are thread-safe and we never
+mutate session state after creation). With HTTP2_ENABLED and httpx[http2] installed,
+an httpx.Client with HTTP/2 is used instead.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_POOL_MAXSIZE, HTTP2_ENABLED
+
+USER_AGENT = "PulseAI/1.0 (+https://github.com/rschaurasiya/Pulse_AI_github)"
+
+# Exceptions callers should catch (including httpx's when HTTP/2 is enabled)
+REQUEST_ERRORS = (requests.exceptions.RequestException,)
+HTTP_STATUS_ERRORS = (requests.exceptions.HTTPError,)
+if HTTP2_ENABLED:
+    try:
+        import httpx
+        REQUEST_ERRORS += (httpx.HTTPError,)
+        HTTP_STATUS_ERRORS += (httpx.HTTPStatusError,)
+    except ImportError:
+        httpx = None
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _create_requests_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+def _create_httpx_client():
+    return httpx.Client(
+        http2=True,
+        headers={"User-Agent": USER_AGENT},
+        follow_redirects=True,
+        timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=HTTP_POOL_MAXSIZE * 4, max_keepalive_connections=HTTP_POOL_MAXSIZE),
+    )
+
+
+def get_client():
+    """Returns the shared HTTP client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                client = None
+                if HTTP2_ENABLED:
+                    try:
+                        client = _create_httpx_client()
+                    except (ImportError, TypeError, AttributeError):
+                        # httpx missing (None) or installed without the h2 extra
+                        print("HTTP2_ENABLED is set but httpx[http2] is not installed. Using HTTP/1.1.")
+                _client = client or _create_requests_session()
+    return _client
+
+
+def _timeout(client, timeout):
+    """Normalizes seconds or (connect, read) into what the active client expects."""
+    if timeout is None:
+        timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    if isinstance(client, requests.Session):
+        return timeout
+    if isinstance(timeout, tuple):
+        return httpx.Timeout(timeout[1], connect=timeout[0])
+    return httpx.Timeout(timeout)
+
+
+def http_get(url, params=None, timeout=None, **kwargs):
+    """GET through the shared client. timeout: seconds or (connect, read)."""
+    client = get_client()
+    return client.get(url, params=params, timeout=_timeout(client, timeout), **kwargs)
+
+
+def http_post(url, json=None, timeout=None, **kwargs):
+    """POST through the shared client. timeout: seconds or (connect, read)."""
+    client = get_client()
+    return client.post(url, json=json, timeout=_timeout(client, timeout), **kwargs)
+
+
+def http_get_limited(url, max_bytes, params=None, timeout=None, **kwargs):
+    """
+    Streams a GET body and stops reading past max_bytes, so an oversized page is never
+    downloaded in full. Returns (response, body), with body None when it is too large.
+    """
+    client = get_client()
+    chunk_size = 64 * 1024
+    if isinstance(client, requests.Session):
+        response = client.get(url, params=params, timeout=_timeout(client, timeout), stream=True, **kwargs)
+        chunks = response.iter_content(chunk_size)
+    else:
+        response = client.send(client.build_request("GET", url, params=params, timeout=_timeout(client, timeout), **kwargs),
+                               stream=True)
+        chunks = response.iter_bytes(chunk_size)
+    try:
+        if int(response.headers.get("Content-Length") or 0) > max_bytes:
+            return response, None
+        body, size = [], 0
+        for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                return response, None
+            body.append(chunk)
+        return response, b"".join(body)
+    finally:
+        response.close()
@@ -0,0 +1,125 @@
+"""
+Headless ingestion worker for multi-replica deployments.
+
+Runs the news_fetcher pipeline once per cluster and publishes each category's normalized
+feed to a shared SQLite file (FEED_STORE_PATH). Web replicas started with the same
+FEED_STORE_PATH only read from it, so upstream quota use no longer scales with replicas.
+
+Usage:
+    python -m services.ingest [--once] [--interval 300] [--categories Technology,Business]
+"""
+import argparse
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from config import settings
+from services.news_fetcher import fetch_news, get_available_categories, is_newer, published_key
+from services.storage import SQLiteStorage
+
+# Each category's feed is one document under a reserved owner id
+FEEDS_OWNER = "_ingest"
+FEEDS_COLLECTION = "feeds"
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_feed_store(path=None):
+    """Returns the process-wide store for the feed file (FEED_STORE_PATH by default)."""
+    path = path or settings.FEED_STORE_PATH
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = SQLiteStorage(path)
+        return _stores[path]
+
+
+def publish_feed(store, category, items, now=None):
+    """
+    Publishes a category's feed. Feeds missing from this run keep their previous items until
+    FEED_CARRY_MAX_AGE after their last successful fetch, so a broken feed drops out eventually.
+    """
+    now = now or datetime.now(timezone.utc)
+    previous = store.get(FEEDS_OWNER, FEEDS_COLLECTION, category) or {}
+    # Last successful fetch per feed (docs published before this was tracked: the doc's time)
+    fetched_at = dict.fromkeys({item.get('feed') for item in previous.get('items', [])},
+                               previous.get('published_at', now.isoformat()))
+    fetched_at.update(previous.get('feed_fetched_at', {}))
+    fetched_at.update(dict.fromkeys({item.get('feed') for item in items}, now.isoformat()))
+
+    cutoff = now.timestamp() - settings.FEED_CARRY_MAX_AGE
+    live = {feed for feed, at in fetched_at.items() if datetime.fromisoformat(at).timestamp() > cutoff}
+    fetched_feeds = {item.get('feed') for item in items}
+    carried = [item for item in previous.get('items', [])
+               if item.get('feed') not in fetched_feeds and item.get('feed') in live]
+
+    store.set(FEEDS_OWNER, FEEDS_COLLECTION, category, {
+        'category': category,
+        'items': items + carried,
+        'published_at': now.isoformat(),
+        'feed_fetched_at': {feed: at for feed, at in fetched_at.items() if feed in live},
+    })
+    return len(items), len(carried)
+
+
+def load_feed(category, since=None, store=None):
+    """
+    Reads a published feed (newest first). since: {feed: datetime} - only items newer
+    than those, like fetch_news(since=...). Returns [] if nothing is published yet.
+    """
+    store = store or get_feed_store()
+    doc = store.get(FEEDS_OWNER, FEEDS_COLLECTION, category)
+    if not doc:
+        print(f"No published feed for {category} yet. Is the ingest worker running?")
+        return []
+
+    items = doc.get('items', [])
+    if since:
+        newest_known = max(since.values())
+        items = [item for item in items if is_newer(item, since.get(item.get('feed'), newest_known))]
+    return sorted(items, key=published_key, reverse=True)
+
+
+def ingest_once(store, categories):
+    """Fetches and publishes every category once."""
+    for category in categories:
+        started = time.perf_counter()
+        items = fetch_news(category)
+        if not items:
+            print(f"[ingest] {category}: no items fetched, keeping the previous feed")
+            continue
+        fetched, carried = publish_feed(store, category, items)
+        print(f"[ingest] {category}: {fetched} items published"
+              f"{f' (+{carried} carried over)' if carried else ''} in {time.perf_counter() - started:.1f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", help="feed store file (default: FEED_STORE_PATH)")
+    parser.add_argument("--interval", type=int, help="seconds between runs (default: INGEST_INTERVAL)")
+    parser.add_argument("--categories", help="comma-separated categories (default: all)")
+    parser.add_argument("--once", action="store_true", help="ingest once and exit")
+    args = parser.parse_args(argv)
+
+    path = args.store or settings.FEED_STORE_PATH
+    if not path:
+        print("Set FEED_STORE_PATH (or pass --store) to the shared feed file.")
+        return 2
+    store = get_feed_store(path)
+    interval = args.interval or settings.INGEST_INTERVAL
+    categories = [c.strip() for c in args.categories.split(",")] if args.categories else get_available_categories()
+
+    try:
+        while True:
+            started = time.monotonic()
+            ingest_once(store, categories)
+            if args.once:
+                return 0
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Latency-aware model router for Groq chat completions.
+
+Each request gets a fallback chain built from GROQ_MODELS (smallest first):
+- translations and short inputs (<= ROUTER_SHORT_INPUT_TOKENS) start on the small model,
+  long articles on the large one; the other models follow as fallbacks
+- a model whose recent calls (at least ROUTER_MIN_CALLS) show a p50 latency over
+  ROUTER_LATENCY_SLO or an error rate over ROUTER_MAX_ERROR_RATE moves behind the
+  healthy ones
+- a model that keeps failing is skipped by its circuit breaker until the cool-down ends
+
+The SDK's own retries are off: a failed call moves on to the next model instead of retrying
+the same one with backoff.
+"""
+import threading
+import time
+from collections import deque
+
+from config import settings
+from config.settings import (
+    GROQ_MODELS, ROUTER_SHORT_INPUT_TOKENS, ROUTER_LATENCY_SLO, ROUTER_MAX_ERROR_RATE, ROUTER_MIN_CALLS, LLM_TIMEOUT,
+    BREAKER_FAILURES, BREAKER_COOLDOWN,
+)
+from services.resilience import get_breaker
+from utils.tracing import span
+
+WINDOW = 20          # recent calls per model used for latency / error rate
+STATS_MAX_AGE = 300  # seconds; older calls are ignored, so a demoted model gets retried
+
+_client = None
+_client_lock = threading.Lock()
+_stats = {}  # model -> deque of (finished at, seconds, ok)
+_stats_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the shared Groq client (created on first use)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from groq import Groq  # Imported on first use to keep cold start light
+                _client = Groq(api_key=settings.GROQ_API_KEY, base_url=settings.GROQ_BASE_URL,
+                               max_retries=0, timeout=LLM_TIMEOUT)
+    return _client
+
+
+def _record(model, seconds, ok):
+    with _stats_lock:
+        _stats.setdefault(model, deque(maxlen=WINDOW)).append((time.monotonic(), seconds, ok))
+
+
+def model_stats(model):
+    """Rolling {"p50": seconds or None, "error_rate": 0..1, "calls": n} for a model."""
+    cutoff = time.monotonic() - STATS_MAX_AGE
+    with _stats_lock:
+        calls = [(seconds, ok) for at, seconds, ok in _stats.get(model, ()) if at >= cutoff]
+    latencies = sorted(seconds for seconds, ok in calls if ok)
+    return {
+        "p50": latencies[len(latencies) // 2] if latencies else None,
+        "error_rate": sum(not ok for _, ok in calls) / len(calls) if calls else 0.0,
+        "calls": len(calls),
+    }
+
+
+def is_degraded(model):
+    """True when the model's recent calls are too slow (p50) or fail too often."""
+    stats = model_stats(model)
+    if stats["calls"] < ROUTER_MIN_CALLS:
+        return False  # Too few calls to judge
+    too_slow = stats["p50"] is not None and stats["p50"] > ROUTER_LATENCY_SLO
+    return too_slow or stats["error_rate"] > ROUTER_MAX_ERROR_RATE
+
+
+def route(task, input_tokens):
+    """Returns the ordered list of models to try for a request."""
+    small_first = task == "translate" or input_tokens <= ROUTER_SHORT_INPUT_TOKENS
+    chain = list(GROQ_MODELS) if small_first else list(reversed(GROQ_MODELS))
+
+    # Degraded models (slow or error-prone) stay in the chain as fallbacks behind healthy ones
+    return sorted(chain, key=is_degraded)
+
+
+def complete(prompt, task="summarize", input_tokens=0, json_mode=False):
+    """
+    Runs a single-message chat completion through the fallback chain.
+    json_mode: ask the model for a JSON object (the prompt must mention JSON).
+    Returns (content, model); raises the last error if every model fails.
+    """
+    extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+    last_error = RuntimeError("no Groq model available (all circuits open)")
+    for model in route(task, input_tokens):
+        breaker = get_breaker(f"groq:{model}", BREAKER_FAILURES, BREAKER_COOLDOWN)
+        if not breaker.allow():
+            continue
+        started = time.perf_counter()
+        try:
+            with span(f"llm.{model}"):
+                response = get_client().chat.completions.create(
+                    messages=[{"role": "user", "content": prompt}],
+                    model=model,
+                    **extra,
+                )
+            content = response.choices[0].message.content
+            if not content or not content.strip():
+                raise ValueError(f"empty completion from {model}")
+        except Exception as e:
+            _record(model, time.perf_counter() - started, False)
+            breaker.record_failure()
+            print(f"Groq model {model} failed ({task}): {e}")
+            last_error = e
+            continue
+        _record(model, time.perf_counter() - started, True)
+        breaker.record_success()
+        return content, model
+    raise last_error
@@ -1,7 +1,18 @@
-import requests
-import feedparser
-from datetime import datetime
-from config.settings import NEWS_API_KEY, GNEWS_API_KEY
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from config import settings
+from config.settings import (
+    HTTP_CONNECT_TIMEOUT, NEWSAPI_BUDGET, GNEWS_BUDGET, RSS_FEED_BUDGET,
+    BREAKER_FAILURES, BREAKER_COOLDOWN,
+)
+from services.quota import acquire, record_response
+from services.resilience import JobSkipped, get_breaker, hedged_call, run_with_deadlines
+from utils.tracing import span, traced
 
 # RSS Feeds by category
 RSS_FEEDS = {
@@ -62,89 +73,268 @@ def get_available_categories():
     """Returns list of available news categories"""
     return list(NEWSAPI_CATEGORIES.keys())
 
+# --- Article Identity / Timestamps (used by incremental refresh) ---
+
+# Query parameters that don't change which article a link points to
+_TRACKING_PARAMS = ("utm_", "ref", "cmpid", "ocid", "fbclid", "gclid", "at_medium", "at_campaign")
+
+def canonical_key(item):
+    """Stable identity of an article across fetches: hash of its normalized link (title if no link)."""
+    link = (item.get('link') or '').strip()
+    if link and link != '#':
+        parts = urlsplit(link)
+        query = [(k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith(_TRACKING_PARAMS)]
+        host = parts.netloc.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        link = urlunsplit(("https", host, parts.path.rstrip('/'), urlencode(sorted(query)), ""))
+    else:
+        link = (item.get('title') or '').strip().lower()
+    return hashlib.md5(link.encode()).hexdigest()
+
+def parse_published(value):
+    """Parses an ISO 8601 (APIs) or RFC 822 (RSS) date into an aware datetime; None if unparseable."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        try:
+            dt = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+def published_key(item):
+    """Sort key: the item's parsed publish time (unparseable dates sort last)."""
+    return parse_published(item.get('published')) or _EPOCH
+
+def newest_by_feed(items):
+    """{feed: newest published datetime} over items, for fetch_news(since=...)."""
+    newest = {}
+    for item in items:
+        feed, published = item.get('feed'), parse_published(item.get('published'))
+        if feed and published and (feed not in newest or published > newest[feed]):
+            newest[feed] = published
+    return newest
+
+def is_newer(item, since):
+    """True if the item was published after `since` (or since is None, or its date is unparseable)."""
+    published = parse_published(item.get('published'))
+    return since is None or published is None or published > since
+
+def _newer_than(items, since):
+    return [item for item in items if is_newer(item, since)]
+
+def merge_news(existing, fresh):
+    """
+    Merges freshly fetched items into an existing feed by canonical_key. Existing item dicts
+    are kept as-is (hydrated summaries survive). Returns (merged newest first, new_items).
+    """
+    known = {canonical_key(item) for item in existing}
+    new_items = []
+    for item in fresh:
+        key = canonical_key(item)
+        if key not in known:
+            known.add(key)
+            new_items.append(item)
+    merged = existing + new_items
+    merged.sort(key=published_key, reverse=True)
+    return merged, new_items
+
+# (provider, category) -> that provider's last full response, reused whenever the provider
+# isn't called (quota held back, circuit open) or fails
+_api_results = {}
+
+def _api_get(provider, url, params, budget):
+    """
+    GET for the API sources, hedged when HEDGE_AFTER_SECONDS is set. `budget` is wall-clock
+    from the start (connect, headers and body, hedge included): past it a
+    requests Timeout is raised, so a trickling upstream fails like any other request
+    error. Every response (hedges included) is reported to the quota tracker.
+    """
+    import requests
+    from services.http_client import http_get
+
+    started = time.monotonic()
+
+    def call():
+        # No single read may outlast what's left of the budget (hedges start later)
+        read_timeout = max(0.1, budget - (time.monotonic() - started))
+        response = http_get(url, params=params, timeout=(HTTP_CONNECT_TIMEOUT, read_timeout))
+        record_response(provider, response.status_code, response.headers)
+        response.raise_for_status()
+        return response.json()
+
+    hedge_after = settings.HEDGE_AFTER_SECONDS if 0 < settings.HEDGE_AFTER_SECONDS < budget else None
+    try:
+        return hedged_call(call, hedge_after, timeout=budget)
+    except TimeoutError as e:
+        raise requests.exceptions.Timeout(f"{provider}: {e}") from e
+
+@traced("news.newsapi")
+def _request_newsapi(category, max_results, since=None):
+    """NewsAPI.org request; raises on network/HTTP errors. since: only items newer than this."""
+    category_param = NEWSAPI_CATEGORIES.get(category, "general")
+    url = f"{settings.NEWSAPI_BASE_URL}/v2/top-headlines"
+    params = {
+        'category': category_param,
+        'country': 'us',
+        'apiKey': settings.NEWS_API_KEY,
+        'pageSize': max_results
+    }
+    data = _api_get("NewsAPI", url, params, NEWSAPI_BUDGET)
+
+    news_items = []
+    if data.get('status') == 'ok':
+        for article in data.get('articles', []):
+            item = {
+                "title": article.get('title', 'No Title'),
+                "link": article.get('url', '#'),
+                "published": article.get('publishedAt', datetime.now().isoformat()),
+                "summary": article.get('description', 'No description available'),
+                "image": article.get('urlToImage'),
+                "source": f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}",
+                "feed": "NewsAPI"
+            }
+            news_items.append(item)
+    _api_results[("NewsAPI", category)] = news_items
+    # top-headlines has no date filter, so `since` is applied here
+    return _newer_than(news_items, since)
+
 def fetch_from_newsapi(category="Technology", max_results=5):
     """
     Fetches news from NewsAPI.org
     Returns a list of news items
     """
-    if not NEWS_API_KEY:
+    from services.http_client import REQUEST_ERRORS  # Lazy: requests loads on first fetch
+
+    if not settings.NEWS_API_KEY:
         print("NewsAPI key not found. Add 'NEWS_API_ORG' to .env (local) or Streamlit Secrets (cloud)")
         return []
     
     try:
-        category_param = NEWSAPI_CATEGORIES.get(category, "general")
-        url = f"https://newsapi.org/v2/top-headlines"
-        params = {
-            'category': category_param,
-            'country': 'us',
-            'apiKey': NEWS_API_KEY,
-            'pageSize': max_results
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        news_items = []
-        if data.get('status') == 'ok':
-            for article in data.get('articles', []):
-                item = {
-                    "title": article.get('title', 'No Title'),
-                    "link": article.get('url', '#'),
-                    "published": article.get('publishedAt', datetime.now().isoformat()),
-                    "summary": article.get('description', 'No description available'),
-                    "image": article.get('urlToImage'),
-                    "source": f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}"
-                }
-                news_items.append(item)
-        
-        return news_items
-    
-    except requests.exceptions.RequestException as e:
+        return _request_newsapi(category, max_results)
+    except REQUEST_ERRORS as e:
         print(f"Error fetching from NewsAPI: {e}")
         return []
 
+@traced("news.gnews")
+def _request_gnews(category, max_results, since=None):
+    """GNews.io request; raises on network/HTTP errors. since: only items newer than this."""
+    category_param = GNEWS_CATEGORIES.get(category, "general")
+    url = f"{settings.GNEWS_BASE_URL}/api/v4/top-headlines"
+    params = {
+        'category': category_param,
+        'lang': 'en',
+        'country': 'us',
+        'apikey': settings.GNEWS_API_KEY,
+        'max': max_results
+    }
+    if since is not None:
+        params['from'] = since.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    data = _api_get("GNews", url, params, GNEWS_BUDGET)
+
+    news_items = []
+    for article in data.get('articles', []):
+        item = {
+            "title": article.get('title', 'No Title'),
+            "link": article.get('url', '#'),
+            "published": article.get('publishedAt', datetime.now().isoformat()),
+            "summary": article.get('description', 'No description available'),
+            "image": article.get('image'),
+            "source": f"GNews - {article.get('source', {}).get('name', 'Unknown')}",
+            "feed": "GNews"
+        }
+        news_items.append(item)
+    # `from` limits the response to new items, so fold them into the last full one
+    cached = _api_results.get(("GNews", category), []) if since is not None else []
+    _api_results[("GNews", category)] = merge_news(cached, news_items)[0][:max_results]
+    return _newer_than(news_items, since)  # `from` is inclusive
+
 def fetch_from_gnews(category="Technology", max_results=5):
     """
     Fetches news from GNews.io
     Returns a list of news items
     """
-    if not GNEWS_API_KEY:
+    from services.http_client import REQUEST_ERRORS
+
+    if not settings.GNEWS_API_KEY:
         print("GNews API key not found. Add 'GNEWS_IO' to .env (local) or Streamlit Secrets (cloud)")
         return []
     
     try:
-        category_param = GNEWS_CATEGORIES.get(category, "general")
-        url = f"https://gnews.io/api/v4/top-headlines"
-        params = {
-            'category': category_param,
-            'lang': 'en',
-            'country': 'us',
-            'apikey': GNEWS_API_KEY,
-            'max': max_results
-        }
+        return _request_gnews(category, max_results)
+    except REQUEST_ERRORS as e:
+        print(f"Error fetching from GNews: {e}")
+        return []
+
+# rss_url -> (etag, last_modified, newest item in that response); lets a refresh send a
+# conditional GET and skip unchanged feeds
+_feed_validators = {}
+_feed_validators_lock = threading.Lock()
+
+@traced("news.rss")
+def _fetch_rss_feed(rss_url, max_results, since=None):
+    """
+    Downloads and parses one RSS feed (read timeout = RSS_FEED_BUDGET); raises on errors.
+    since: only items newer than this (a 304 Not Modified returns []).
+    """
+    import feedparser
+    from bs4 import BeautifulSoup
+    from services.http_client import http_get
+
+    headers = {}
+    with _feed_validators_lock:
+        etag, last_modified, newest = _feed_validators.get(rss_url, (None, None, None))
+    # Validators only prove "nothing newer than `newest`" - use them if the caller has that much
+    if since is not None and newest is not None and since >= newest:
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+    # Download through the pooled client (keep-alive + timeouts), then parse the bytes
+    response = http_get(rss_url, timeout=(HTTP_CONNECT_TIMEOUT, RSS_FEED_BUDGET), headers=headers)
+    if response.status_code == 304:
+        return []
+    response.raise_for_status()
+    feed = feedparser.parse(response.content)
+    
+    # Get the source name from the feed title
+    source_name = feed.feed.get('title', 'RSS Feed')
+    
+    news_items = []
+    for entry in feed.entries[:max_results]:
+        # Get published date
+        published = entry.get('published', entry.get('updated', datetime.now().isoformat()))
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        # Get summary/description
+        summary = entry.get('summary', entry.get('description', 'No description available'))
         
-        news_items = []
-        for article in data.get('articles', []):
-            item = {
-                "title": article.get('title', 'No Title'),
-                "link": article.get('url', '#'),
-                "published": article.get('publishedAt', datetime.now().isoformat()),
-                "summary": article.get('description', 'No description available'),
-                "image": article.get('image'),
-                "source": f"GNews - {article.get('source', {}).get('name', 'Unknown')}"
-            }
-            news_items.append(item)
+        # Remove HTML tags from summary if present
+        if '<' in summary:
+            soup = BeautifulSoup(summary, 'html.parser')
+            summary = soup.get_text()
         
-        return news_items
-    
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching from GNews: {e}")
-        return []
+        item = {
+            "title": entry.get('title', 'No Title'),
+            "link": entry.get('link', '#'),
+            "published": published,
+            "summary": summary[:500],  # Limit summary length
+            "image": entry.get('media_content', [{}])[0].get('url') if entry.get('media_content') else None,
+            "source": f"RSS - {source_name}",
+            "feed": rss_url
+        }
+        news_items.append(item)
+
+    if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+        newest = max((d for d in map(parse_published, (i['published'] for i in news_items)) if d), default=None)
+        with _feed_validators_lock:
+            _feed_validators[rss_url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'), newest)
+    return _newer_than(news_items, since)
 
 def fetch_from_rss(category="Technology", max_results=5):
     """
@@ -156,62 +346,88 @@ def fetch_from_rss(category="Technology", max_results=5):
     
     for rss_url in rss_urls:
         try:
-            feed = feedparser.parse(rss_url)
-            
-            # Get the source name from the feed title
-            source_name = feed.feed.get('title', 'RSS Feed')
-            
-            # Process each entry in the feed
-            for entry in feed.entries[:max_results]:
-                # Get published date
-                published = entry.get('published', entry.get('updated', datetime.now().isoformat()))
-                
-                # Get summary/description
-                summary = entry.get('summary', entry.get('description', 'No description available'))
-                
-                # Remove HTML tags from summary if present
-                from bs4 import BeautifulSoup
-                if '<' in summary:
-                    soup = BeautifulSoup(summary, 'html.parser')
-                    summary = soup.get_text()
-                
-                item = {
-                    "title": entry.get('title', 'No Title'),
-                    "link": entry.get('link', '#'),
-                    "published": published,
-                    "summary": summary[:500],  # Limit summary length
-                    "image": entry.get('media_content', [{}])[0].get('url') if entry.get('media_content') else None,
-                    "source": f"RSS - {source_name}"
-                }
-                news_items.append(item)
-            
+            news_items.extend(_fetch_rss_feed(rss_url, max_results))
         except Exception as e:
             print(f"Error fetching from RSS feed {rss_url}: {e}")
             continue
     
     return news_items[:max_results]
 
-def fetch_news(category="Technology"):
+def _breaker(name):
+    return get_breaker(name, BREAKER_FAILURES, BREAKER_COOLDOWN)
+
+def _quota_allows(provider, category):
+    """Asks the quota scheduler whether to call a daily-limited API for this category now."""
+    cold = (provider, category) not in _api_results
+    return acquire(provider, category, get_available_categories(), cold=cold)
+
+def _quota_job(provider, category, request):
+    """Wraps an API request so quota is only taken when the job actually runs (breaker allowed)."""
+    def job():
+        if not _quota_allows(provider, category):
+            raise JobSkipped(f"{provider} held back by its daily quota")
+        return request()
+    return job
+
+def fetch_news(category="Technology", since=None):
     """
     Fetches news from NewsAPI.org, GNews.io, and RSS feeds
     Combines and returns a list of dictionaries containing title, link, published, summary, and source.
+
+    All sources are requested concurrently, each with its own latency budget and circuit
+    breaker; sources that fail or miss their budget are left out (partial results).
+    NewsAPI and GNews are only called when the quota scheduler allows it; when they aren't
+    called (or fail), their last response is reused.
+    since: {feed: datetime} from newest_by_feed() - only return items newer than those (refresh).
     """
     all_news = []
+    since = dict(since or {})
+    if since:
+        # Feeds with nothing in the current list (capped out, or failed last time) only
+        # contribute what's newer than anything already shown
+        newest_known = max(since.values())
+        for feed in ["NewsAPI", "GNews"] + RSS_FEEDS.get(category, RSS_FEEDS["General"]):
+            since.setdefault(feed, newest_known)
     
     # Fetch from all three sources - Increased limits for pagination
-    newsapi_items = fetch_from_newsapi(category, max_results=10)
-    gnews_items = fetch_from_gnews(category, max_results=10)
-    rss_items = fetch_from_rss(category, max_results=20)
+    jobs = {}
+    if settings.NEWS_API_KEY:
+        jobs["NewsAPI"] = (_quota_job("NewsAPI", category, lambda: _request_newsapi(category, 10, since.get("NewsAPI"))),
+                           NEWSAPI_BUDGET, _breaker("NewsAPI"))
+    else:
+        print("NewsAPI key not found. Add 'NEWS_API_ORG' to .env (local) or Streamlit Secrets (cloud)")
+    if settings.GNEWS_API_KEY:
+        jobs["GNews"] = (_quota_job("GNews", category, lambda: _request_gnews(category, 10, since.get("GNews"))),
+                         GNEWS_BUDGET, _breaker("GNews"))
+    else:
+        print("GNews API key not found. Add 'GNEWS_IO' to .env (local) or Streamlit Secrets (cloud)")
+    rss_urls = RSS_FEEDS.get(category, RSS_FEEDS["General"])
+    for rss_url in rss_urls:
+        jobs[rss_url] = (lambda url=rss_url: _fetch_rss_feed(url, 20, since.get(url)), RSS_FEED_BUDGET, _breaker(rss_url))
+
+    with span("news.fetch"):
+        results = run_with_deadlines(jobs)
+    for provider in ("NewsAPI", "GNews"):
+        if provider in jobs and provider not in results:
+            results[provider] = _newer_than(_api_results.get((provider, category), []), since.get(provider))
     
-    # Combine results
-    all_news.extend(newsapi_items)
-    all_news.extend(gnews_items)
-    all_news.extend(rss_items)
+    # Combine results (RSS feeds in feed order, capped like fetch_from_rss)
+    all_news.extend(results.get("NewsAPI", []))
+    all_news.extend(results.get("GNews", []))
+    rss_items = [item for url in rss_urls for item in results.get(url, [])]
+    all_news.extend(rss_items[:20])
     
-    # Sort by published date (most recent first)
-    try:
-        all_news.sort(key=lambda x: x['published'], reverse=True)
-    except:
-        pass  # If sorting fails, keep original order
+    # Sort by published date (most recent first; ISO and RFC 822 dates compared as datetimes)
+    all_news.sort(key=published_key, reverse=True)
     
     return all_news  # Return all fetched articles
+
+def get_news(category="Technology", since=None):
+    """
+    News for the UI: the feed published by the ingest worker when FEED_STORE_PATH is set
+    (web replicas never call upstreams), otherwise a live fetch_news().
+    """
+    if settings.FEED_STORE_PATH:
+        from services.ingest import load_feed  # Lazy: ingest imports this module
+        return load_feed(category, since)
+    return fetch_news(category, since)
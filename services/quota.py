@@ -0,0 +1,197 @@
+"""
+Daily quota accounting and refresh scheduling for NewsAPI and GNews.
+
+Both free tiers allow about 100 requests per day. Instead of calling them on every cache
+miss and refresh, fetch_news asks acquire() first:
+- each provider's remaining requests are spread over the rest of the UTC day; a category
+  gets a share proportional to how often it's requested (its popularity), so its minimum
+  refresh interval is  seconds_to_reset / (remaining * share)
+- a process with no cached response yet may call early, but never into the last
+  QUOTA_COLD_RESERVE requests
+- a rejection (HTTP 403/429) pauses the provider for Retry-After / the rate-limit reset
+  header when present, else QUOTA_BACKOFF seconds doubling on repeats; quota headers on
+  any response correct the local count
+
+Usage is persisted per provider in QUOTA_STORE_PATH, so restarts (and other processes on
+the host) don't start from a fresh allowance. Every change is a single read-modify-write
+transaction on the store (BEGIN IMMEDIATE in SQLite), so concurrent processes never
+lose each other's counts.
+"""
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from config import settings
+from config.settings import NEWSAPI_DAILY_QUOTA, GNEWS_DAILY_QUOTA, QUOTA_COLD_RESERVE, QUOTA_BACKOFF
+
+QUOTA_OWNER = "_quota"
+QUOTA_COLLECTION = "providers"
+DAILY_LIMITS = {"NewsAPI": NEWSAPI_DAILY_QUOTA, "GNews": GNEWS_DAILY_QUOTA}
+REJECTED_STATUSES = (403, 429)
+
+_store = None
+
+
+def _get_store():
+    global _store
+    if _store is None:
+        from services.storage import MemoryStorage, SQLiteStorage
+
+        path = settings.QUOTA_STORE_PATH
+        try:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            _store = SQLiteStorage(path)
+        except Exception as e:
+            print(f"Quota store {path} unavailable, counting in memory only: {e}")
+            _store = MemoryStorage()
+    return _store
+
+
+def _today(now):
+    return datetime.fromtimestamp(now, timezone.utc).date().isoformat()
+
+
+def _seconds_to_reset(now):
+    """Seconds until the next UTC midnight, when the daily allowances reset."""
+    today = datetime.fromtimestamp(now, timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(1.0, (today + timedelta(days=1)).timestamp() - now)
+
+
+def _current(provider, state, now):
+    """A provider's stored state (or a fresh one), rolled over to today's allowance."""
+    state = state or {
+        "day": _today(now), "used": 0, "limit": DAILY_LIMITS[provider], "remaining": None,
+        "blocked_until": 0.0, "backoff": 0.0, "last_call": {}, "demand": {},
+    }
+    if state["day"] != _today(now):
+        # New allowance; yesterday's demand still hints at today's popularity
+        state.update(day=_today(now), used=0, remaining=None, backoff=0.0)
+        state["demand"] = {category: count / 2 for category, count in state["demand"].items()}
+    return state
+
+
+def _update(provider, now, change):
+    """Runs change(state) on a provider's state and saves it, in one store transaction. Returns change's result."""
+    result = []
+
+    def apply(stored):
+        state = _current(provider, stored, now)
+        result.append(change(state))
+        return state
+
+    _get_store().update(QUOTA_OWNER, QUOTA_COLLECTION, provider, apply)
+    return result[0]
+
+
+def _remaining(state):
+    remaining = state["limit"] - state["used"]
+    if state["remaining"] is not None:
+        remaining = min(remaining, state["remaining"])  # The provider's own count wins
+    return remaining
+
+
+def _allowed(state, category, categories, cold, now):
+    if now < state["blocked_until"]:
+        return False
+    remaining = _remaining(state)
+    if remaining <= 0:
+        return False
+    if cold and remaining > QUOTA_COLD_RESERVE:
+        return True
+
+    demand = state["demand"]
+    share = (demand.get(category, 0) + 1) / sum(demand.get(c, 0) + 1 for c in set(categories) | {category})
+    interval = _seconds_to_reset(now) / (remaining * share)
+    return now - state["last_call"].get(category, 0.0) >= interval
+
+
+def acquire(provider, category, categories, cold=False):
+    """
+    Returns True if `provider` may be called for `category` now, and counts the request.
+    categories: every category (for popularity shares). cold: this process has no cached
+    response for the pair yet.
+    """
+    now = time.time()
+
+    def take(state):
+        state["demand"][category] = state["demand"].get(category, 0) + 1
+        allowed = _allowed(state, category, categories, cold, now)
+        if allowed:
+            state["used"] += 1
+            if state["remaining"] is not None:
+                state["remaining"] -= 1
+            state["last_call"][category] = now
+        return allowed
+
+    return _update(provider, now, take)
+
+
+def _header_number(headers, *names):
+    for name in names:
+        try:
+            return float(headers[name])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+def _retry_after(headers, now):
+    """Seconds to wait from Retry-After (delta seconds or HTTP date) or a rate-limit reset header."""
+    value = headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+    reset = _header_number(headers, "X-RateLimit-Reset", "RateLimit-Reset")
+    if reset is not None:
+        return max(0.0, reset - now) if reset > 1e9 else reset  # epoch seconds or delta
+    return None
+
+
+def record_response(provider, status, headers):
+    """Updates a provider's quota from a response: its quota headers and any rejection."""
+    now = time.time()
+    limit = _header_number(headers, "X-RateLimit-Limit", "RateLimit-Limit")
+    remaining = _header_number(headers, "X-RateLimit-Remaining", "RateLimit-Remaining")
+    rejected = status in REJECTED_STATUSES
+    if limit is None and remaining is None and not rejected and status >= 400:
+        return
+
+    def apply(state):
+        if limit is not None:
+            state["limit"] = int(limit)
+        if remaining is not None:
+            state["remaining"] = int(remaining)
+        if rejected:
+            state["backoff"] = min(max(state["backoff"] * 2, QUOTA_BACKOFF), _seconds_to_reset(now))
+            wait = _retry_after(headers, now)
+            if wait is None:
+                wait = _seconds_to_reset(now) if remaining == 0 else state["backoff"]
+            state["blocked_until"] = now + wait
+            print(f"{provider} rejected a request (HTTP {status}); pausing it for {wait / 60:.0f} min")
+        elif status < 400:
+            state["backoff"] = 0.0
+
+    _update(provider, now, apply)
+
+
+def quota_status():
+    """{provider: {"used", "remaining", "limit", "paused_for"}} for today."""
+    now = time.time()
+    states = {provider: _current(provider, _get_store().get(QUOTA_OWNER, QUOTA_COLLECTION, provider), now)
+              for provider in DAILY_LIMITS}
+    return {
+        provider: {
+            "used": state["used"],
+            "remaining": max(0, _remaining(state)),
+            "limit": state["limit"],
+            "paused_for": max(0.0, state["blocked_until"] - now),
+        }
+        for provider, state in states.items()
+    }
@@ -0,0 +1,221 @@
+"""
+In-process TF-IDF engine for related articles and personalized ("For you") ranking.
+
+One index per category holds every article seen in that category (title + description),
+keyed by canonical_key and shared by all sessions. Documents are stored as a CSR matrix in
+plain NumPy arrays (indptr / indices / data), so similarity against the whole corpus is a
+gather, a multiply and an np.add.reduceat - no per-document Python loop.
+
+- add(items): incremental; only unseen articles are tokenized. IDF weights are refreshed
+  lazily on the next query, which also drops vocabulary terms left unused by evicted
+  articles once they make up half of it.
+- related(items, k): top-k most similar indexed articles for each given article.
+- rank(items, profile): recency blended with similarity to a profile vector built from the
+  user's own summaries (build_profile; ones in the current category get CATEGORY_BOOST).
+"""
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from services.news_fetcher import canonical_key, parse_published
+
+MAX_DOCS = 2000              # per category; oldest articles are evicted first
+RELATED_MIN_SCORE = 0.12     # cosine similarity below this isn't "related"
+RECENCY_HALF_LIFE_HOURS = 12
+PERSONAL_WEIGHT = 1.0        # similarity to the user's summaries vs. recency (both 0..1)
+CATEGORY_BOOST = 2.0         # weight of the user's summaries from the category being ranked
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'\-]+")
+STOP_WORDS = frozenset("""
+a about after again against all also an and any are as at be because been before being between
+both but by can could did do does during each few for from further had has have he her here his
+how i if in into is it its just more most new news no not now of off on once only or other our
+out over own said same says she should so some such than that the their them then there these
+they this those through to too under until up very was we were what when where which while who
+why will with would you your read continue full story
+""".split())
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def tokenize(text):
+    """Lowercased word tokens without stop words or 1-2 character noise."""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) > 2 and t not in STOP_WORDS]
+
+
+def _document_text(item):
+    return f"{item.get('title') or ''} {item.get('title') or ''} {item.get('summary') or ''}"  # Title counts double
+
+
+class TfidfIndex:
+    """Incremental TF-IDF index over one category's articles (see module docstring)."""
+
+    def __init__(self, max_docs=MAX_DOCS):
+        self.max_docs = max_docs
+        self._lock = threading.Lock()
+        self._vocab = {}               # term -> column
+        self._docs = OrderedDict()     # key -> (columns, counts, item); insertion = age order
+        self._csr = None               # (keys, rows, indptr, indices, data, idf, metas, vocab) until the next add
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, items):
+        """Indexes articles not seen before. Returns how many were added."""
+        added = 0
+        with self._lock:
+            for item in items:
+                key = canonical_key(item)
+                if key in self._docs:
+                    continue
+                counts = Counter(tokenize(_document_text(item)))
+                if not counts:
+                    continue  # Nothing to match on (and reduceat needs non-empty rows)
+                columns = np.fromiter((self._vocab.setdefault(t, len(self._vocab)) for t in counts), np.int64, len(counts))
+                self._docs[key] = (columns, np.fromiter(counts.values(), np.float32, len(counts)),
+                                   {"title": item.get('title'), "link": item.get('link'), "published": item.get('published')})
+                added += 1
+            while len(self._docs) > self.max_docs:
+                self._docs.popitem(last=False)
+            if added:
+                self._csr = None
+        return added
+
+    def _compact_vocab(self, df):
+        """Drops terms no indexed article uses any more (df 0) and renumbers the columns. Call under _lock."""
+        used = df > 0
+        remap = np.cumsum(used) - 1  # old column -> new column
+        self._vocab = {term: int(remap[col]) for term, col in self._vocab.items() if used[col]}
+        for key, (columns, counts, meta) in self._docs.items():
+            self._docs[key] = (remap[columns], counts, meta)
+        return df[used]
+
+    def _matrix(self):
+        """Builds (or returns the cached) L2-normalized TF-IDF CSR arrays."""
+        with self._lock:
+            if self._csr is None and self._docs:
+                keys = list(self._docs)
+                df = np.bincount(np.concatenate([self._docs[k][0] for k in keys]), minlength=len(self._vocab))
+                if np.count_nonzero(df) * 2 < len(self._vocab):
+                    df = self._compact_vocab(df)  # Evicted articles left most terms unused
+                columns = [self._docs[k][0] for k in keys]
+                counts = np.concatenate([self._docs[k][1] for k in keys])
+                lengths = np.fromiter(map(len, columns), np.int64, len(columns))
+                indices = np.concatenate(columns)
+                indptr = np.concatenate(([0], np.cumsum(lengths)))
+
+                n_docs = len(keys)
+                idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+                data = (1 + np.log(counts)) * idf[indices]
+                norms = np.sqrt(np.add.reduceat(data * data, indptr[:-1]))
+                data /= np.repeat(norms, lengths)
+                metas = [self._docs[k][2] for k in keys]
+                # The vocabulary is kept with the arrays: a later compaction renumbers columns
+                self._csr = (keys, {k: i for i, k in enumerate(keys)}, indptr, indices, data, idf, metas, self._vocab)
+            return self._csr
+
+    def _scores(self, dense_queries, csr):
+        """Cosine similarity of each dense query row against every indexed document."""
+        _, _, indptr, indices, data, _, _, _ = csr
+        return np.add.reduceat(dense_queries[:, indices] * data, indptr[:-1], axis=1)
+
+    def _dense_rows(self, rows, csr):
+        _, _, indptr, indices, data, idf, _, _ = csr
+        dense = np.zeros((len(rows), len(idf)), np.float32)
+        for i, row in enumerate(rows):
+            start, end = indptr[row], indptr[row + 1]
+            dense[i, indices[start:end]] = data[start:end]
+        return dense
+
+    def related(self, items, k=3):
+        """For each item, up to k related indexed articles as [{"title", "link", "published"}]."""
+        csr = self._matrix()
+        if csr is None:
+            return [[] for _ in items]
+        rows_by_key, metas = csr[1], csr[6]
+        item_keys = [canonical_key(item) for item in items]
+        present = [(i, rows_by_key[key]) for i, key in enumerate(item_keys) if key in rows_by_key]
+        results = [[] for _ in items]
+        if not present:
+            return results
+
+        rows = [row for _, row in present]
+        scores = self._scores(self._dense_rows(rows, csr), csr)
+        scores[np.arange(len(rows)), rows] = -1.0  # Not related to itself
+        k = min(k, scores.shape[1] - 1)
+        if k <= 0:
+            return results
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for (i, _), cols, row_scores in zip(present, top, scores):
+            cols = cols[np.argsort(-row_scores[cols])]
+            seen = {(items[i].get('title') or '').lower()}  # Skip syndicated copies of the same story
+            for col in cols:
+                title = (metas[col]['title'] or '').lower()
+                if row_scores[col] < RELATED_MIN_SCORE or title in seen:
+                    continue
+                seen.add(title)
+                results[i].append(metas[col])
+        return results
+
+    def profile(self, texts_with_weights):
+        """
+        Normalized TF-IDF profile {term: weight} for [(text, weight)] (e.g. the user's
+        summaries). Keyed by term, so it stays valid when the vocabulary is renumbered.
+        """
+        csr = self._matrix()
+        if csr is None:
+            return None
+        idf, vocab = csr[5], csr[7]
+        weights = Counter()
+        for text, weight in texts_with_weights:
+            counts = Counter(t for t in tokenize(text) if vocab.get(t, len(idf)) < len(idf))
+            for term, count in counts.items():
+                weights[term] += weight * (1 + np.log(count)) * idf[vocab[term]]
+        norm = np.sqrt(sum(w * w for w in weights.values()))
+        return {term: w / norm for term, w in weights.items()} if norm else None
+
+    def rank(self, items, profile=None, now=None):
+        """
+        Returns items ordered by recency (half-life RECENCY_HALF_LIFE_HOURS) plus
+        PERSONAL_WEIGHT x similarity to `profile`. Without a profile this is newest first.
+        """
+        now = now or time.time()
+        published = [parse_published(item.get('published')) for item in items]
+        age_hours = np.array([(now - p.timestamp()) / 3600 if p else 1e6 for p in published], np.float32)
+        score = np.power(0.5, np.maximum(age_hours, 0) / RECENCY_HALF_LIFE_HOURS)
+
+        csr = self._matrix() if profile is not None else None
+        if csr is not None:
+            rows_by_key, idf, vocab = csr[1], csr[5], csr[7]
+            vector = np.zeros(len(idf), np.float32)
+            for term, weight in profile.items():
+                col = vocab.get(term, len(idf))
+                if col < len(idf):
+                    vector[col] = weight
+            rows = np.array([rows_by_key.get(canonical_key(item), -1) for item in items])
+            doc_scores = self._scores(vector[np.newaxis, :], csr)[0]
+            score = score + PERSONAL_WEIGHT * np.where(rows >= 0, doc_scores[np.maximum(rows, 0)], 0.0)
+        order = np.argsort(-score, kind="stable")
+        return [items[i] for i in order]
+
+
+def get_index(category):
+    """Returns the process-wide index for a category (created on first use)."""
+    with _indexes_lock:
+        index = _indexes.get(category)
+        if index is None:
+            index = _indexes[category] = TfidfIndex()
+        return index
+
+
+def build_profile(index, summaries, category):
+    """Profile from the user's summary docs; ones saved under `category` get CATEGORY_BOOST."""
+    texts = [
+        (f"{doc.get('title') or ''} {doc.get('summary') or ''}", CATEGORY_BOOST if doc.get('category') == category else 1.0)
+        for doc in summaries
+    ]
+    return index.profile(texts) if texts else None
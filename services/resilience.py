@@ -0,0 +1,211 @@
+"""
+Deadlines, circuit breakers, hedged requests and request coalescing for upstream calls.
+
+- CircuitBreaker: after `failure_threshold` consecutive failures (errors or calls over
+  budget) a source is skipped until `cooldown` seconds pass; then one trial call is let
+  through (half-open) and its outcome closes or re-opens the breaker.
+- hedged_call: starts a second identical call if the first hasn't answered within
+  `hedge_after` seconds and returns whichever finishes first, within an optional
+  wall-clock timeout.
+- run_with_deadlines: runs jobs concurrently and returns whatever finished inside each
+  job's own budget; late jobs are abandoned and count as failures.
+- single_flight: concurrent identical requests (same operation and content) share one
+  in-flight call instead of each hitting the upstream.
+"""
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.tracing import span
+
+# Shared pool for upstream calls. Abandoned (late) calls keep a worker until their
+# HTTP timeout fires, so leave headroom. Hedges get their own pool so a hedged call
+# running inside _executor never waits on work queued behind itself.
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="upstream")
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="upstream-hedge")
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+_flights = {}  # (operation, content hash) -> Future of the in-flight call
+_flights_lock = threading.Lock()
+
+
+class CircuitBreaker:
+    """Per-source breaker: closed -> open (skip) -> half-open (one trial) -> closed."""
+
+    def __init__(self, name, failure_threshold=3, cooldown=300.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """True if a call may go out now (half-open lets a single trial call through)."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release(self):
+        """Gives back a half-open trial slot without recording an outcome."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_running:
+                    print(f"Circuit open for {self.name} (cool-down {self.cooldown:.0f}s)")
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class JobSkipped(Exception):
+    """Raised by a run_with_deadlines job that decides not to call its source (no outcome is recorded)."""
+
+
+def get_breaker(name, failure_threshold=3, cooldown=300.0):
+    """Returns the process-wide breaker for a source, creating it on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, cooldown)
+        return breaker
+
+
+def hedged_call(func, hedge_after=None, timeout=None):
+    """
+    Calls func(); if it hasn't returned after `hedge_after` seconds, calls it again in
+    parallel and returns the first successful result (raises if both fail).
+    timeout: wall-clock limit from the start, hedge included. Past it TimeoutError is
+    raised and calls still running are abandoned (so a trickling upstream can't hold the
+    caller past its budget). hedge_after=None: no hedge, just the time limit.
+    """
+    started = time.monotonic()
+    hedge_at = started + hedge_after if hedge_after is not None else None
+    deadline = started + timeout if timeout is not None else None
+    pending = {_hedge_executor.submit(func)}
+    error = None
+    while pending:
+        now = time.monotonic()
+        if deadline is not None and now >= deadline:
+            raise TimeoutError(f"no answer within {timeout:.1f}s")
+        if hedge_at is not None and now >= hedge_at:
+            pending.add(_hedge_executor.submit(func))
+            hedge_at = None
+        wake = [t for t in (hedge_at, deadline) if t is not None]
+        done, pending = wait(pending, timeout=min(wake) - now if wake else None, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def run_with_deadlines(jobs):
+    """
+    Runs jobs concurrently and collects results within per-job budgets.
+
+    jobs: {name: (func, budget_seconds, breaker or None)}. Jobs whose breaker is open are
+    skipped. Returns {name: result} for the jobs that finished successfully in time.
+    A job still queued at its deadline (pool saturated), or one that raises JobSkipped,
+    is dropped without blaming the source.
+    """
+    started = time.monotonic()
+    pending = {}
+    for name, (func, budget, breaker) in jobs.items():
+        if breaker is not None and not breaker.allow():
+            print(f"Skipping {name}: circuit open")
+            continue
+        pending[_executor.submit(func)] = (name, started + budget, budget, breaker)
+
+    results = {}
+    while pending:
+        now = time.monotonic()
+        for future in [f for f, (_, deadline, _, _) in pending.items() if deadline <= now and not f.done()]:
+            name, _, budget, breaker = pending.pop(future)
+            if future.cancel():
+                print(f"{name} not started within its {budget:.1f}s budget; skipped")
+                if breaker is not None:
+                    breaker.release()
+                continue
+            print(f"{name} missed its {budget:.1f}s budget; returning without it")
+            if breaker is not None:
+                breaker.record_failure()
+        if not pending:
+            break
+
+        next_deadline = min(deadline for _, deadline, _, _ in pending.values())
+        done, _ = wait(pending, timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+        for future in done:
+            name, _, _, breaker = pending.pop(future)
+            if isinstance(future.exception(), JobSkipped):
+                if breaker is not None:
+                    breaker.release()
+                continue
+            if future.exception() is not None:
+                print(f"Error fetching from {name}: {future.exception()}")
+                if breaker is not None:
+                    breaker.record_failure()
+                continue
+            results[name] = future.result()
+            if breaker is not None:
+                breaker.record_success()
+    return results
+
+
+def single_flight(operation, content, func):
+    """
+    Runs func() once for concurrent identical requests. A caller arriving while another
+    call with the same (operation, hash of content) is in flight waits for it and gets
+    the same result or exception. Nothing is kept after the call ends (callers cache).
+    """
+    key = (operation, hashlib.sha1(repr(content).encode("utf-8")).hexdigest())
+    with _flights_lock:
+        future = _flights.get(key)
+        leader = future is None
+        if leader:
+            future = _flights[key] = Future()
+    if not leader:
+        with span(f"{operation}.coalesced"):
+            return future.result()
+
+    try:
+        result = func()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
@@ -0,0 +1,248 @@
+"""
+Storage backends for user-scoped documents (summaries, bookmarks).
+
+Every backend stores documents as users/{user_id}/{collection}/{doc_id}, the same
+layout as Firestore, so FirebaseManager can work against any of them:
+
+- FirestoreStorage: the production backend (needs a firestore client)
+- SQLiteStorage:    a single local file, no network
+- MemoryStorage:    process-local dicts, for benchmarks and local runs
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+# Document fields holding datetimes (SQLite stores them as sortable ISO strings)
+TIMESTAMP_FIELDS = ("created_at", "saved_at")
+_TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+class FirestoreStorage:
+    """Documents stored in Cloud Firestore."""
+
+    def __init__(self, db):
+        self._db = db
+
+    def _collection(self, user_id, collection):
+        return self._db.collection('users').document(user_id).collection(collection)
+
+    def get(self, user_id, collection, doc_id):
+        doc = self._collection(user_id, collection).document(doc_id).get()
+        return doc.to_dict() if doc.exists else None
+
+    def set(self, user_id, collection, doc_id, data):
+        self._collection(user_id, collection).document(doc_id).set(data)
+
+    def set_many(self, user_id, writes):
+        """Writes [(collection, doc_id, data), ...] atomically in one WriteBatch."""
+        batch = self._db.batch()
+        for collection, doc_id, data in writes:
+            batch.set(self._collection(user_id, collection).document(doc_id), data)
+        batch.commit()
+
+    def delete(self, user_id, collection, doc_id):
+        self._collection(user_id, collection).document(doc_id).delete()
+
+    def watch(self, user_id, collection, callback):
+        """
+        Registers an on_snapshot listener on a user's collection.
+        callback(changes) receives [(doc_id, data or None if removed), ...] on a background thread.
+        Returns the watch handle (call .unsubscribe() to stop).
+        """
+        def on_snapshot(col_snapshot, changes, read_time):
+            callback([
+                (change.document.id, None if change.type.name == 'REMOVED' else change.document.to_dict())
+                for change in changes
+            ])
+
+        return self._collection(user_id, collection).on_snapshot(on_snapshot)
+
+    def query(self, user_id, collection, order_by, limit=None, start_after=None, filters=None,
+              start_after_id=None, with_ids=False):
+        """
+        Documents ordered by `order_by` (newest first, ties by doc id descending), optionally
+        filtered by field equality. Documents without `order_by` are left out.
+        start_after (+ start_after_id): resume after that document. with_ids: return [(doc_id, data)].
+        """
+        from firebase_admin import firestore
+
+        query = self._collection(user_id, collection)
+        for field, value in (filters or {}).items():
+            query = query.where(field, '==', value)
+        query = query.order_by(order_by, direction=firestore.Query.DESCENDING)
+        if start_after is not None and start_after_id is not None:
+            # Same as Firestore's implicit tie order; spelled out so the cursor can name it
+            query = query.order_by('__name__', direction=firestore.Query.DESCENDING)
+            query = query.start_after({order_by: start_after, '__name__': start_after_id})
+        elif start_after is not None:
+            query = query.start_after({order_by: start_after})
+        if limit:
+            query = query.limit(limit)
+        return [(doc.id, doc.to_dict()) if with_ids else doc.to_dict() for doc in query.stream()]
+
+
+class MemoryStorage:
+    """Documents kept in process memory. Data is lost on restart."""
+
+    def __init__(self):
+        self._docs = {}  # (user_id, collection) -> {doc_id: data}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, collection, doc_id):
+        with self._lock:
+            data = self._docs.get((user_id, collection), {}).get(doc_id)
+            return dict(data) if data is not None else None
+
+    def set(self, user_id, collection, doc_id, data):
+        with self._lock:
+            self._docs.setdefault((user_id, collection), {})[doc_id] = dict(data)
+
+    def set_many(self, user_id, writes):
+        with self._lock:
+            for collection, doc_id, data in writes:
+                self._docs.setdefault((user_id, collection), {})[doc_id] = dict(data)
+
+    def delete(self, user_id, collection, doc_id):
+        with self._lock:
+            self._docs.get((user_id, collection), {}).pop(doc_id, None)
+
+    def update(self, user_id, collection, doc_id, change):
+        """Atomic read-modify-write: stores change(current doc or None) and returns it."""
+        with self._lock:
+            docs = self._docs.setdefault((user_id, collection), {})
+            current = docs.get(doc_id)
+            data = change(dict(current) if current is not None else None)
+            docs[doc_id] = dict(data)
+            return data
+
+    def query(self, user_id, collection, order_by, limit=None, start_after=None, filters=None,
+              start_after_id=None, with_ids=False):
+        with self._lock:
+            docs = [(doc_id, dict(d)) for doc_id, d in self._docs.get((user_id, collection), {}).items()
+                    if d.get(order_by) is not None]
+        for field, value in (filters or {}).items():
+            docs = [(doc_id, d) for doc_id, d in docs if d.get(field) == value]
+        docs.sort(key=lambda pair: (pair[1][order_by], pair[0]), reverse=True)
+        if start_after is not None and start_after_id is not None:
+            docs = [(doc_id, d) for doc_id, d in docs if (d[order_by], doc_id) < (start_after, start_after_id)]
+        elif start_after is not None:
+            docs = [(doc_id, d) for doc_id, d in docs if d[order_by] < start_after]
+        docs = docs[:limit] if limit else docs
+        return docs if with_ids else [d for _, d in docs]
+
+
+class SQLiteStorage:
+    """Documents stored as JSON rows in a local SQLite file."""
+
+    def __init__(self, path):
+        # WAL + busy timeout: other processes (web replicas, the ingest worker) can read
+        # while one writes
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " user_id TEXT NOT NULL, collection TEXT NOT NULL, doc_id TEXT NOT NULL,"
+                " data TEXT NOT NULL, PRIMARY KEY (user_id, collection, doc_id))"
+            )
+
+    @staticmethod
+    def _encode(data):
+        data = dict(data)
+        for field in TIMESTAMP_FIELDS:
+            if isinstance(data.get(field), datetime):
+                data[field] = data[field].strftime(_TS_FORMAT)
+        return json.dumps(data, default=str)
+
+    @staticmethod
+    def _decode(raw):
+        data = json.loads(raw)
+        for field in TIMESTAMP_FIELDS:
+            if isinstance(data.get(field), str):
+                try:
+                    data[field] = datetime.strptime(data[field], _TS_FORMAT)
+                except ValueError:
+                    pass
+        return data
+
+    def get(self, user_id, collection, doc_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM documents WHERE user_id = ? AND collection = ? AND doc_id = ?",
+                (user_id, collection, doc_id),
+            ).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def set(self, user_id, collection, doc_id, data):
+        self.set_many(user_id, [(collection, doc_id, data)])
+
+    def set_many(self, user_id, writes):
+        rows = [(user_id, collection, doc_id, self._encode(data)) for collection, doc_id, data in writes]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)", rows)
+
+    def delete(self, user_id, collection, doc_id):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM documents WHERE user_id = ? AND collection = ? AND doc_id = ?",
+                (user_id, collection, doc_id),
+            )
+
+    def update(self, user_id, collection, doc_id, change):
+        """
+        Atomic read-modify-write: stores change(current doc or None) and returns it.
+        Runs in one BEGIN IMMEDIATE transaction, so it is atomic across processes too.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT data FROM documents WHERE user_id = ? AND collection = ? AND doc_id = ?",
+                    (user_id, collection, doc_id),
+                ).fetchone()
+                data = change(self._decode(row[0]) if row else None)
+                self._conn.execute("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                                   (user_id, collection, doc_id, self._encode(data)))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return data
+
+    def query(self, user_id, collection, order_by, limit=None, start_after=None, filters=None,
+              start_after_id=None, with_ids=False):
+        sql = "SELECT doc_id, data FROM documents WHERE user_id = ? AND collection = ? AND json_extract(data, ?) IS NOT NULL"
+        params = [user_id, collection, f"$.{order_by}"]
+        for field, value in (filters or {}).items():
+            sql += " AND json_extract(data, ?) = ?"
+            params += [f"$.{field}", value]
+        if start_after is not None:
+            if isinstance(start_after, datetime):
+                start_after = start_after.strftime(_TS_FORMAT)
+            if start_after_id is not None:
+                sql += " AND (json_extract(data, ?) < ? OR (json_extract(data, ?) = ? AND doc_id < ?))"
+                params += [f"$.{order_by}", start_after, f"$.{order_by}", start_after, start_after_id]
+            else:
+                sql += " AND json_extract(data, ?) < ?"
+                params += [f"$.{order_by}", start_after]
+        sql += " ORDER BY json_extract(data, ?) DESC, doc_id DESC"
+        params.append(f"$.{order_by}")
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(doc_id, self._decode(data)) if with_ids else self._decode(data) for doc_id, data in rows]
+
+
+def create_storage(backend, sqlite_path=None, firestore_client=None):
+    """Builds the storage backend named in config ('firestore', 'sqlite' or 'memory')."""
+    if backend == "memory":
+        return MemoryStorage()
+    if backend == "sqlite":
+        return SQLiteStorage(sqlite_path)
+    if backend == "firestore":
+        return FirestoreStorage(firestore_client)
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}' (expected firestore, sqlite or memory)")
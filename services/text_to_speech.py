@@ -1,22 +1,108 @@
-from gtts import gTTS
+"""
+Text-to-speech with gTTS, synthesized chunk by chunk.
+
+gTTS splits text into parts of up to 100 characters and makes one request per part.
+stream_audio() yields each part's MP3 as soon as it is ready, so playback can start after
+the first request, and keeps recent parts in an LRU cache keyed by (lang, text): replaying
+a summary (or a translation of it) doesn't hit the TTS service again.
+"""
 import io
+import threading
+from collections import OrderedDict
 
-def text_to_audio(text, lang='en'):
+from config.settings import TTS_CACHE_SIZE
+from services.resilience import single_flight
+from utils.tracing import span, traced
+
+MP3_BYTES_PER_SECOND = 4000  # gTTS returns 32 kbps mono MP3
+MAX_PART_CHARS = 100         # gTTS's per-request limit (gTTS.GOOGLE_TTS_MAX_CHARS)
+
+_cache = OrderedDict()  # (lang, text part) -> MP3 bytes
+_lock = threading.Lock()
+
+
+def _cached(key):
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    return None
+
+
+def _store(key, audio):
+    with _lock:
+        _cache[key] = audio
+        while len(_cache) > TTS_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _split(text):
     """
-    Converts text to audio bytes using gTTS.
+    Splits text into gTTS-sized parts with gTTS's public tokenizer and its default
+    pre-processors and cases (what gTTS itself does before its requests).
+    """
+    from gtts.tokenizer import Tokenizer, pre_processors, tokenizer_cases
+
+    text = text.strip()
+    for pre_process in (pre_processors.tone_marks, pre_processors.end_of_line,
+                        pre_processors.abbreviations, pre_processors.word_sub):
+        text = pre_process(text)
+    if len(text) <= MAX_PART_CHARS:
+        tokens = [text]
+    else:
+        tokens = Tokenizer([tokenizer_cases.tone_marks, tokenizer_cases.period_comma,
+                            tokenizer_cases.colon, tokenizer_cases.other_punctuation]).run(text)
+
+    parts = []
+    for token in tokens:
+        token = token.strip()
+        while len(token) > MAX_PART_CHARS:
+            # Still too long (no punctuation): cut at the last space that fits
+            cut = token.rfind(" ", 0, MAX_PART_CHARS)
+            cut = cut if cut > 0 else MAX_PART_CHARS
+            parts.append(token[:cut].strip())
+            token = token[cut:].strip()
+        parts.append(token)
+    # Parts with nothing to say (lone punctuation) make gTTS fail
+    return [part for part in parts if any(ch.isalnum() for ch in part)]
+
+
+def _synthesize(part, lang):
+    from gtts import gTTS
+
+    with span("tts.gtts"):
+        return b"".join(gTTS(text=part, lang=lang, slow=False).stream())
+
+
+def stream_audio(text, lang='en'):
+    """
+    Yields MP3 bytes for `text` one gTTS part at a time (concatenating them gives the
+    whole clip). Stops early on a TTS error.
     """
+    if not text:
+        return
     try:
-        if not text:
-            return None
-            
-        tts = gTTS(text=text, lang=lang, slow=False)
-        
-        # Save to a bytes buffer
-        fp = io.BytesIO()
-        tts.write_to_fp(fp)
-        fp.seek(0)
-        
-        return fp
+        for part in _split(text):
+            key = (lang, part)
+            audio = _cached(key)
+            if audio is None:
+                # Listeners of the same summary at once share each chunk's request
+                audio = single_flight("tts", key, lambda: _synthesize(part, lang))
+                _store(key, audio)
+            yield audio
     except Exception as e:
         print(f"TTS Error: {e}")
-        return None
+
+
+def audio_seconds(audio):
+    """Approximate playback length of gTTS MP3 bytes."""
+    return len(audio) / MP3_BYTES_PER_SECOND
+
+
+@traced("tts.text_to_audio")
+def text_to_audio(text, lang='en'):
+    """
+    Converts text to audio bytes using gTTS.
+    """
+    audio = b"".join(stream_audio(text, lang))
+    return io.BytesIO(audio) if audio else None
@@ -0,0 +1,196 @@
+"""
+Card thumbnails for article images.
+
+Each image URL is downloaded once in the background, center-cropped and resized with Pillow
+to THUMB_SIZE, and stored as a small WebP file in a size-bounded disk cache
+(THUMB_CACHE_DIR, oldest files evicted past THUMB_CACHE_MAX_MB), so the browser never loads
+the multi-megabyte original.
+
+The cache lives in the app's static/ folder: with Streamlit static serving on
+(server.enableStaticServing, set in .streamlit/config.toml) cards link to
+app/static/thumbnails/<hash>.webp, which the browser fetches once and caches, so reruns
+only resend the URL. Otherwise cards fall back to inline data: URIs.
+
+Rendering never waits for a download: get_thumbnail() returns None until the file exists,
+and the card shows it on a later rerun.
+"""
+import base64
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import HTTP_CONNECT_TIMEOUT, THUMB_SIZE, THUMB_CACHE_DIR, THUMB_CACHE_MAX_MB
+
+IMAGE_READ_TIMEOUT = 8
+MAX_IMAGE_BYTES = 8 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40_000_000    # decompression-bomb guard
+MEMORY_CACHE_SIZE = 300          # data URIs kept in memory (LRU, static serving off)
+FAILED_CACHE_SIZE = 2000         # failed URLs remembered (LRU)
+FAILED_RETRY_AFTER = 3600        # seconds before a failed URL is tried again
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(PROJECT_ROOT, "static")  # Streamlit serves it at app/static/
+CACHE_DIR = os.path.join(PROJECT_ROOT, THUMB_CACHE_DIR)
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="thumbnails")
+_inflight = set()
+_failed = OrderedDict()          # URL that isn't a usable image -> failed at (monotonic)
+_memory = OrderedDict()          # url hash -> data URI
+_lock = threading.Lock()
+_disk_usage = None               # bytes in CACHE_DIR (scanned on first write)
+_static_base = None              # "app/static/..." URL prefix of CACHE_DIR, "" if not served
+
+
+def _key(url):
+    return hashlib.md5(url.encode()).hexdigest()
+
+
+def _path(key):
+    return os.path.join(CACHE_DIR, f"{key}.webp")
+
+
+def _static_url(key):
+    """The thumbnail's URL under Streamlit static file serving, or None when it isn't served."""
+    global _static_base
+    if _static_base is None:
+        base = ""
+        try:
+            import streamlit as st
+
+            relative = os.path.relpath(CACHE_DIR, STATIC_DIR)
+            if st.get_option("server.enableStaticServing") and not relative.startswith(".."):
+                base = "app/static/" + relative.replace(os.sep, "/")
+        except Exception as e:
+            print(f"Thumbnail static serving unavailable, using data URIs: {e}")
+        _static_base = base
+    return f"{_static_base}/{key}.webp" if _static_base else None
+
+
+def _recently_failed(url):
+    """True if url failed within FAILED_RETRY_AFTER seconds. Call under _lock."""
+    failed_at = _failed.get(url)
+    if failed_at is None:
+        return False
+    if time.monotonic() - failed_at > FAILED_RETRY_AFTER:
+        del _failed[url]
+        return False
+    return True
+
+
+def make_thumbnail(data, size=THUMB_SIZE):
+    """Center-crops and resizes image bytes to `size`; returns WebP bytes."""
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("RGB", (size[0] * 2, size[1] * 2))  # JPEG: decode at reduced scale
+        thumb = ImageOps.fit(image.convert("RGB"), size, Image.LANCZOS)
+    out = io.BytesIO()
+    thumb.save(out, "WEBP", quality=70, method=4)
+    return out.getvalue()
+
+
+def _evict_if_needed(added):
+    """Keeps the disk cache under THUMB_CACHE_MAX_MB by deleting the oldest files."""
+    global _disk_usage
+    with _lock:
+        if _disk_usage is None:
+            _disk_usage = sum(e.stat().st_size for e in os.scandir(CACHE_DIR) if e.is_file())
+        else:
+            _disk_usage += added
+        limit = THUMB_CACHE_MAX_MB * 1024 * 1024
+        if _disk_usage <= limit:
+            return
+        entries = sorted((e for e in os.scandir(CACHE_DIR) if e.is_file()), key=lambda e: e.stat().st_mtime)
+        for entry in entries:
+            if _disk_usage <= limit * 0.9:  # Free a little extra so we don't evict on every write
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                _disk_usage -= size
+            except OSError:
+                pass
+
+
+def _fetch(url):
+    from services.http_client import http_get_limited
+
+    key = _key(url)
+    try:
+        response, data = http_get_limited(url, MAX_IMAGE_BYTES, timeout=(HTTP_CONNECT_TIMEOUT, IMAGE_READ_TIMEOUT))
+        response.raise_for_status()
+        if not response.headers.get("Content-Type", "image/").startswith("image/"):
+            raise ValueError(f"not an image ({response.headers.get('Content-Type')})")
+        if data is None:
+            raise ValueError(f"image over {MAX_IMAGE_BYTES} bytes")
+        thumb = make_thumbnail(data)
+
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{_path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(thumb)
+        os.replace(tmp, _path(key))  # Atomic: readers never see a partial file
+        _evict_if_needed(len(thumb))
+    except Exception as e:
+        print(f"Thumbnail failed for {url}: {e}")
+        with _lock:
+            _failed[url] = time.monotonic()
+            _failed.move_to_end(url)
+            while len(_failed) > FAILED_CACHE_SIZE:
+                _failed.popitem(last=False)
+    finally:
+        with _lock:
+            _inflight.discard(url)
+
+
+def prefetch_thumbnails(urls):
+    """Starts background thumbnail creation for image URLs not cached yet. Returns immediately."""
+    for url in urls:
+        if not url or not url.startswith(("http://", "https://")):
+            continue
+        with _lock:
+            if url in _inflight or _recently_failed(url) or _key(url) in _memory:
+                continue
+        if os.path.exists(_path(_key(url))):
+            continue
+        with _lock:
+            if url in _inflight:
+                continue
+            _inflight.add(url)
+        _executor.submit(_fetch, url)
+
+
+def get_thumbnail(url):
+    """
+    Returns the thumbnail's src if it's ready - a static file URL, or a data: URI when
+    static serving is off - else None (and queues it).
+    """
+    if not url:
+        return None
+    key = _key(url)
+    static_url = _static_url(key)
+    if static_url:
+        if os.path.exists(_path(key)):
+            return static_url
+        prefetch_thumbnails([url])
+        return None
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+    try:
+        with open(_path(key), "rb") as f:
+            uri = "data:image/webp;base64," + base64.b64encode(f.read()).decode("ascii")
+    except OSError:
+        prefetch_thumbnails([url])
+        return None
+    with _lock:
+        _memory[key] = uri
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+    return uri
@@ -1,32 +1,161 @@
-from groq import Groq
-from config.settings import GROQ_API_KEY
+"""
+Batched translation of summaries with Groq.
 
-def translate_to_hindi(text):
+translate_batch() takes many texts and many target languages and packs them into as few
+requests as TRANSLATION_BATCH_TOKENS allows; the model replies with one JSON object holding
+every translation. Replies are validated pair by pair: anything missing or malformed is
+retried once in a follow-up batch, then falls back to the original text. Good translations
+are cached per (text, language), so a page already translated costs nothing to replay.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+from config import settings
+from config.settings import TRANSLATION_LANGUAGES, TRANSLATION_BATCH_TOKENS, TRANSLATION_CACHE_SIZE
+from services.model_router import complete
+from services.resilience import single_flight
+from utils.compaction import estimate_tokens
+from utils.tracing import traced
+
+ATTEMPTS = 2  # first pass + one retry for pairs the model left out
+
+_cache = OrderedDict()  # (text, lang) -> translation
+_lock = threading.Lock()
+
+
+def _cached(key):
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    return None
+
+
+def _store(key, translation):
+    with _lock:
+        _cache[key] = translation
+        while len(_cache) > TRANSLATION_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _batches(texts, langs):
+    """Groups texts so source tokens x languages stays within TRANSLATION_BATCH_TOKENS."""
+    batch, used = [], 0
+    for text in texts:
+        cost = estimate_tokens(text) * len(langs)
+        if batch and used + cost > TRANSLATION_BATCH_TOKENS:
+            yield batch
+            batch, used = [], 0
+        batch.append(text)
+        used += cost
+    if batch:
+        yield batch
+
+
+def _prompt(texts, langs):
+    targets = ", ".join(f"{TRANSLATION_LANGUAGES.get(lang, lang)} ({lang})" for lang in langs)
+    example = json.dumps({"0": {lang: "..." for lang in langs}}, ensure_ascii=False)
+    source = json.dumps({str(i): text for i, text in enumerate(texts)}, ensure_ascii=False)
+    return (
+        f"Translate each English text below into: {targets}.\n"
+        "Reply with only a JSON object that maps each text's id to an object with one "
+        f"translation per language code, like {example}.\n\n{source}"
+    )
+
+
+def _parse_reply(content, texts, langs):
+    """Returns {(text, lang): translation} for every valid pair in the model's JSON reply."""
+    start, end = content.find("{"), content.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError("no JSON object in translation reply")
+    reply = json.loads(content[start:end + 1])
+    if not isinstance(reply, dict):
+        raise ValueError("translation reply is not a JSON object")
+
+    results = {}
+    for i, text in enumerate(texts):
+        entry = reply.get(str(i))
+        if not isinstance(entry, dict):
+            continue
+        for lang in langs:
+            translation = entry.get(lang)
+            if isinstance(translation, str) and translation.strip():
+                results[(text, lang)] = translation.strip()
+    return results
+
+
+@traced("groq.translate")
+def _translate(texts, langs):
+    prompt = _prompt(texts, langs)
+    content, _ = complete(prompt, task="translate", input_tokens=estimate_tokens(prompt), json_mode=True)
+    return _parse_reply(content, texts, langs)
+
+
+def translate_batch(texts, langs):
     """
-    Translates English text to Hindi using Groq API.
+    Translates every text into every language code in `langs`.
+    Returns {(text, lang): translation}; pairs that couldn't be translated map to the
+    original text (and aren't cached).
     """
-    if not GROQ_API_KEY:
-        # Graceful fallback: return original text if no API key configured
+    texts = list(dict.fromkeys(t for t in texts if t and t.strip()))
+    results, missing = {}, {}
+    for text in texts:
+        for lang in langs:
+            translation = _cached((text, lang))
+            if translation is None:
+                missing.setdefault(text, []).append(lang)
+            else:
+                results[(text, lang)] = translation
+
+    if missing and not settings.GROQ_API_KEY:
+        # Graceful fallback: original text if no API key configured
         # Key should be in .env (local) or Streamlit Secrets (cloud)
+        missing = {}
+
+    for _ in range(ATTEMPTS):
+        if not missing:
+            break
+        # Texts needing the same languages share a request
+        groups = {}
+        for text, text_langs in missing.items():
+            groups.setdefault(tuple(text_langs), []).append(text)
+        for group_langs, group_texts in groups.items():
+            for batch in _batches(group_texts, group_langs):
+                try:
+                    # Sessions translating the same page at once share one request
+                    translated = single_flight("translate", (batch, group_langs),
+                                               lambda: _translate(batch, list(group_langs)))
+                except Exception as e:
+                    print(f"Translation error: {e}")
+                    continue
+                for key, translation in translated.items():
+                    _store(key, translation)
+                    results[key] = translation
+        missing = {
+            text: [lang for lang in text_langs if (text, lang) not in results]
+            for text, text_langs in missing.items()
+        }
+        missing = {text: text_langs for text, text_langs in missing.items() if text_langs}
+
+    for text in texts:
+        for lang in langs:
+            results.setdefault((text, lang), text)
+    return results
+
+
+def translate(text, lang, context=()):
+    """
+    Translates one text into `lang`. `context`: other texts likely to be needed next
+    (e.g. the rest of the page); they're translated in the same request and cached.
+    """
+    if not text:
         return text
-    
-    try:
-        client = Groq(api_key=GROQ_API_KEY)
-        
-        prompt = f"Translate the following English text to Hindi. Only provide the Hindi translation, nothing else:\n\n{text}"
-        
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
-            model="llama-3.3-70b-versatile",
-        )
-        
-        return chat_completion.choices[0].message.content
-    
-    except Exception as e:
-        print(f"Translation error: {e}")
-        return text  # Return original text on error
+    return translate_batch([text, *context], [lang])[(text, lang)]
+
+
+def translate_to_hindi(text):
+    """
+    Translates English text to Hindi using Groq API.
+    """
+    return translate(text, "hi")
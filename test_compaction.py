@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for summarizer input compaction: feed boilerplate is stripped, real prose
+that merely contains the same words is kept.
+"""
+from utils.compaction import _strip_boilerplate
+
+# (text, expected result; None = must come back unchanged)
+CASES = [
+    ("Study finds people who read more books live longer, a 12-year survey shows.", None),
+    ("Users can click here or swipe to vote for their favourite.", None),
+    ("The ©2024 figure was revised after an audit.", None),
+    ("He said: click here for details was the message. The rest follows here.", None),
+    ("Markets rallied on Friday. Read more at Example News", "Markets rallied on Friday."),
+    ("Markets rallied on Friday. Continue reading...", "Markets rallied on Friday."),
+    ("Markets rallied on Friday. © 2024 Example Media. All rights reserved.", "Markets rallied on Friday."),
+    ("Markets rallied on Friday. The post Markets rally appeared first on example.com.", "Markets rallied on Friday."),
+    ("Markets rallied on Friday | Click here to subscribe", "Markets rallied on Friday."),
+    ("Markets rallied on Friday… [+2140 chars]", "Markets rallied on Friday."),
+]
+
+
+def test_strip_boilerplate():
+    failures = []
+    for text, expected in CASES:
+        result = _strip_boilerplate(text)
+        if result != (expected or text):
+            failures.append(f"{text!r}\n   -> {result!r}\n   expected {expected or text!r}")
+    assert not failures, "\n".join(failures)
+
+
+if __name__ == "__main__":
+    test_strip_boilerplate()
+    print(f"[OK] {len(CASES)} compaction cases")
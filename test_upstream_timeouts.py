@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script: a slow (trickling) NewsAPI/GNews upstream must cost at most the source's
+budget and make fetch_from_newsapi / fetch_from_gnews return [] instead of raising.
+Runs against a local server, no API keys or network needed.
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class TrickleHandler(BaseHTTPRequestHandler):
+    """Sends headers at once, then the JSON body one byte every 100 ms."""
+
+    def do_GET(self):
+        body = b'{"status": "ok", "articles": []}' + b" " * 200
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            for i in range(len(body)):
+                self.wfile.write(body[i:i + 1])
+                self.wfile.flush()
+                time.sleep(0.1)
+        except OSError:
+            pass  # Client gave up
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_trickling_upstream_returns_empty():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TrickleHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.update(NEWS_API_ORG="test-key", GNEWS_IO="test-key", NEWSAPI_BASE_URL=base_url,
+                      GNEWS_BASE_URL=base_url, QUOTA_STORE_PATH=":memory:")
+
+    from services import news_fetcher
+    news_fetcher.NEWSAPI_BUDGET = news_fetcher.GNEWS_BUDGET = 1.0
+    try:
+        for fetch in (news_fetcher.fetch_from_newsapi, news_fetcher.fetch_from_gnews):
+            started = time.monotonic()
+            assert fetch("Technology", max_results=3) == [], f"{fetch.__name__} should return []"
+            elapsed = time.monotonic() - started
+            assert elapsed < 2.5, f"{fetch.__name__} took {elapsed:.1f}s on a 1s budget"
+            print(f"[OK] {fetch.__name__}: [] after {elapsed:.2f}s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_trickling_upstream_returns_empty()
@@ -0,0 +1,97 @@
+"""
+Input compaction for the summarizer.
+
+Article text reaches the LLM with feed boilerplate ("Continue reading...", "[+1234 chars]",
+"The post ... appeared first on ..."), bylines and the title repeated at the start of the
+description. compact_text() strips those and caps the result to a token budget at a
+sentence boundary, so prompts stay small and predictable.
+"""
+import math
+import re
+
+from config.settings import SUMMARY_INPUT_TOKENS
+from utils.helpers import clean_html
+
+CHARS_PER_TOKEN = 4  # Rough average for English text with Llama-family tokenizers
+
+_BOILERPLATE = [re.compile(p, re.IGNORECASE) for p in (
+    r"\[\+\d+ chars\]",                                   # NewsAPI truncation marker
+    r"\ball rights reserved\.?",
+    r"\bwatch:?\s*$",
+)]
+# Calls to action and footers that end the text. They are only stripped as the last short
+# fragment: starting a sentence or after a separator, at most TRAILER_MAX_CHARS long and with
+# no sentence end inside (dots in "example.com" or "..." don't count), so prose like "people
+# who read more books" or "the ©2024 figure" stays.
+TRAILER_MAX_CHARS = 200
+_TRAILER_TAIL = rf"(?:[^.!?]|[.!?…](?!\s)){{0,{TRAILER_MAX_CHARS}}}$"
+_TRAILERS = [re.compile(rf"(?:^|(?<=[.!?…|»])|\s[|»–—-])\s*(?:{p}){_TRAILER_TAIL}", re.IGNORECASE) for p in (
+    r"\b(continue|keep) reading\b",
+    r"\bread (the )?(full|more|rest)( (story|article))?\b(?=\s*($|[.:»›>…]|(at|on|here|about|from)\b))",
+    r"\bclick here\b",
+    r"\bthe post .{0,200}? appeared first on ",          # WordPress feeds
+    r"\bsign up for (our|the) .{0,80}?newsletter\b",
+    r"©",
+)]
+_BYLINE = re.compile(
+    r"^\s*([Bb]y\s+[A-Z][\w.'-]*(\s+[A-Z][\w.'-]*){0,3}(\s*(,|and)\s*[A-Z][\w.'-]*(\s+[A-Z][\w.'-]*){0,3})*\s*[|:\-–—]\s*"
+    r"|[A-Z][A-Za-z .]{1,40}\((Reuters|AP|AFP|Bloomberg)\)\s*[-–—]\s*)"
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text):
+    """Approximate token count (no tokenizer dependency)."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def _normalize(text):
+    return re.sub(r"\s+", " ", clean_html(text or "")).strip()
+
+
+def _strip_boilerplate(text, title=""):
+    text = _normalize(text)
+    if title:
+        # Descriptions often start by repeating the title
+        text = re.sub(rf"^{re.escape(title.rstrip('.'))}\b[\s.:\-–—]*", "", text, count=1, flags=re.IGNORECASE)
+    text = _BYLINE.sub("", text, count=1)
+    for pattern in _BOILERPLATE:
+        text = pattern.sub("", text).strip()
+    for pattern in _TRAILERS:
+        text = pattern.sub("", text, count=1).strip()
+    if text and text[-1] not in ".!?\"'":
+        text = text.rstrip(" .…") + "."  # Trailing "..." from a truncated description
+    return text
+
+
+def _cap(text, max_tokens):
+    """Cuts text to max_tokens, preferring the last full sentence that fits."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    kept = ""
+    for sentence in _SENTENCE_END.split(text):
+        candidate = f"{kept} {sentence}".strip()
+        if len(candidate) > max_chars:
+            break
+        kept = candidate
+    return kept or text[:max_chars].rsplit(" ", 1)[0]
+
+
+def compact_text(title, body, max_tokens=None):
+    """
+    Builds the summarizer input "<title>. <body>" without boilerplate, capped to
+    max_tokens (default SUMMARY_INPUT_TOKENS). Logs the tokens saved.
+    """
+    max_tokens = max_tokens or SUMMARY_INPUT_TOKENS
+    title = _normalize(title)
+    raw = f"{title}. {body or ''}"
+
+    body = _strip_boilerplate(body, title)
+    text = _cap(f"{title}. {body}".strip() if body else title, max_tokens)
+
+    before, after = estimate_tokens(raw), estimate_tokens(text)
+    if before > after:
+        print(f"Summary input compacted: ~{before} -> ~{after} tokens (saved ~{before - after})")
+    return text
+
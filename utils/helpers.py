@@ -1,9 +1,12 @@
 import streamlit as st
 from datetime import datetime
+from functools import lru_cache
+import html
 import re
 
-def load_css(theme="Dark"):
-    """Injects custom CSS to style the Streamlit app based on theme."""
+@lru_cache(maxsize=None)
+def build_css(theme="Dark"):
+    """Builds the minified <style> block for a theme. Memoized: built once per theme per process."""
     
     # --- DESIGN SYSTEM VARIABLES ---
     if theme == "Dark":
@@ -117,6 +120,26 @@ def load_css(theme="Dark"):
         gap: 10px;
     }}
 
+    .news-thumb {{
+        float: right;
+        width: 120px;
+        height: 68px;
+        object-fit: cover;
+        border-radius: 8px;
+        margin: 0 0 8px 16px;
+    }}
+
+    .news-related {{
+        margin-top: 12px;
+        font-size: 0.85rem;
+        color: {current_theme['secondary_text']};
+    }}
+
+    .news-related a {{
+        color: {current_theme['primary']};
+        text-decoration: none;
+    }}
+
     .summary-section {{
         margin-top: 16px;
         padding: 16px;
@@ -168,7 +191,61 @@ def load_css(theme="Dark"):
     
     </style>
     """
-    st.markdown(css, unsafe_allow_html=True)
+    return _minify_css(css)
+
+def _minify_css(css):
+    """Drops comments and collapses whitespace so every rerun ships a smaller payload."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    # Only around punctuation: spaces in descendant selectors and values like "1px solid" stay
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    # ":" only inside declaration blocks ({...} with no nested rules); in a selector
+    # ".card :hover" differs from ".card:hover"
+    css = re.sub(r'\{[^{}]*\}', lambda block: re.sub(r'\s*:\s*', ':', block.group()), css)
+    return css.strip()
+
+def load_css(theme="Dark"):
+    """Injects custom CSS to style the Streamlit app based on theme."""
+    st.markdown(build_css(theme), unsafe_allow_html=True)
+
+# --- Card Rendering ---
+# Each card is emitted as ONE html block (wrapper, meta, optional summary) instead of
+# separate markdown calls for opening, summary, closing tag and spacer.
+_CARD_TEMPLATE = (
+    '{spacer}<div class="news-card">{thumb}'
+    '<a href="{url}" target="_blank" class="news-title">{title}</a>'
+    '<div class="news-meta"><span>Date: {date}</span><span>|</span><span>Source: {source}</span></div>'
+    '{summary}{related}</div>'
+)
+_SUMMARY_TEMPLATE = '<div class="summary-section"><div class="summary-text">{text}</div></div>'
+_THUMB_TEMPLATE = '<img class="news-thumb" src="{src}" alt="" loading="lazy">'
+_RELATED_TEMPLATE = '<div class="news-related">Related: {links}</div>'
+_RELATED_LINK_TEMPLATE = '<a href="{url}" target="_blank">{title}</a>'
+
+def render_card_html(title, url, published, source, summary=None, spacer=False, related=None, thumbnail=None):
+    """
+    Returns the HTML for one news card. spacer=True adds the gap left by the previous card's buttons.
+    related: optional [{"title", "link"}] shown as links under the card.
+    thumbnail: optional image src (from services.thumbnails: a static file URL or data: URI).
+    """
+    links = " · ".join(
+        _RELATED_LINK_TEMPLATE.format(url=html.escape(r.get('link') or "#", quote=True), title=html.escape(r.get('title') or "No Title"))
+        for r in related or ()
+    )
+    return _CARD_TEMPLATE.format(
+        spacer="<br>" if spacer else "",
+        thumb=_THUMB_TEMPLATE.format(src=html.escape(thumbnail, quote=True)) if thumbnail else "",
+        url=html.escape(url or "#", quote=True),
+        title=html.escape(title or "No Title"),
+        date=html.escape(str(format_date(published))),
+        source=html.escape(source or "Unknown Source"),
+        summary=_SUMMARY_TEMPLATE.format(text=html.escape(summary)) if summary else "",
+        related=_RELATED_TEMPLATE.format(links=links) if links else "",
+    )
+
+def render_card(title, url, published, source, summary=None, spacer=False, related=None, thumbnail=None):
+    """Renders one news card with a single st.markdown call."""
+    st.markdown(render_card_html(title, url, published, source, summary, spacer, related, thumbnail), unsafe_allow_html=True)
 
 def clean_html(raw_html):
     """Remove HTML tags from a string."""
@@ -0,0 +1,169 @@
+"""
+Lightweight hot-path tracing.
+
+Wrap a call in `span("name")` (or decorate it with `@traced("name")`) to record its
+duration. Every span feeds:
+- a process-wide rolling window per name, reported as p50/p95/p99 (Prometheus summary
+  format from `prometheus_text()`, served on /metrics by `start_metrics_server()`)
+- the current rerun's list (`rerun_spans()`), for the admin timing panel in the sidebar
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUANTILES = (0.5, 0.95, 0.99)
+WINDOW = 1024  # samples kept per span name for quantiles
+
+_lock = threading.Lock()
+_stats = {}  # name -> {"samples": [...], "next": int, "count": int, "sum": float, "errors": int}
+_local = threading.local()
+_server = None
+_server_attempted = False
+
+
+def _record(name, seconds, error):
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            stat = _stats[name] = {"samples": [], "next": 0, "count": 0, "sum": 0.0, "errors": 0}
+        if len(stat["samples"]) < WINDOW:
+            stat["samples"].append(seconds)
+        else:
+            stat["samples"][stat["next"]] = seconds  # Ring buffer: overwrite the oldest
+            stat["next"] = (stat["next"] + 1) % WINDOW
+        stat["count"] += 1
+        stat["sum"] += seconds
+        stat["errors"] += int(error)
+
+    spans = getattr(_local, "spans", None)
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+@contextmanager
+def span(name):
+    """Times the enclosed block under `name`."""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _record(name, time.perf_counter() - start, error)
+
+
+def traced(name=None):
+    """Decorator form of span(); defaults to the function's qualified name."""
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- Per-rerun Breakdown ---
+
+def start_rerun():
+    """Starts collecting spans for the current script run (call at the top of main)."""
+    _local.spans = []
+    _local.started = time.perf_counter()
+
+
+def rerun_spans():
+    """Returns (spans, elapsed_seconds) recorded so far in the current script run."""
+    spans = list(getattr(_local, "spans", None) or [])
+    started = getattr(_local, "started", None)
+    return spans, (time.perf_counter() - started) if started else 0.0
+
+
+def summarize_spans(spans):
+    """Groups [(name, seconds)] into [(name, calls, total_seconds)], slowest first."""
+    totals = {}
+    for name, seconds in spans:
+        calls, total = totals.get(name, (0, 0.0))
+        totals[name] = (calls + 1, total + seconds)
+    return sorted(((n, c, t) for n, (c, t) in totals.items()), key=lambda r: r[2], reverse=True)
+
+
+# --- Aggregates / Prometheus Export ---
+
+def _quantile(sorted_samples, q):
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, int(q * len(sorted_samples)))]
+
+
+def snapshot():
+    """Returns {name: {"count", "sum", "errors", "p50", "p95", "p99"}} in seconds."""
+    with _lock:
+        stats = {name: (sorted(s["samples"]), s["count"], s["sum"], s["errors"]) for name, s in _stats.items()}
+    return {
+        name: {
+            "count": count, "sum": total, "errors": errors,
+            **{f"p{int(q * 100)}": _quantile(samples, q) for q in QUANTILES},
+        }
+        for name, (samples, count, total, errors) in stats.items()
+    }
+
+
+def prometheus_text():
+    """Renders all spans in Prometheus text exposition format (summary + error counter)."""
+    lines = [
+        "# HELP pulseai_span_seconds Duration of traced hot-path calls.",
+        "# TYPE pulseai_span_seconds summary",
+    ]
+    stats = snapshot()
+    for name in sorted(stats):
+        s = stats[name]
+        for q in QUANTILES:
+            lines.append(f'pulseai_span_seconds{{span="{name}",quantile="{q}"}} {s[f"p{int(q * 100)}"]:.6f}')
+        lines.append(f'pulseai_span_seconds_sum{{span="{name}"}} {s["sum"]:.6f}')
+        lines.append(f'pulseai_span_seconds_count{{span="{name}"}} {s["count"]}')
+    lines += [
+        "# HELP pulseai_span_errors_total Traced calls that raised.",
+        "# TYPE pulseai_span_errors_total counter",
+    ]
+    for name in sorted(stats):
+        lines.append(f'pulseai_span_errors_total{{span="{name}"}} {stats[name]["errors"]}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of the app log
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Serves /metrics on host:port from a daemon thread (once per process; port 0/None = off)."""
+    global _server, _server_attempted
+    if not port:
+        return None
+    with _lock:
+        if not _server_attempted:
+            _server_attempted = True  # One try per process, so a taken port doesn't log every rerun
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            except OSError as e:
+                print(f"Metrics endpoint not started on {host}:{port}: {e}")
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics-endpoint", daemon=True).start()
+    return _server
@@ -0,0 +1,93 @@
+"""
+Bounded per-session UI state.
+
+One UIState lives in st.session_state and replaces the loose per-card keys
+("show_summary_<hash>", "audio_en_<hash>", ...) and the unbounded category cache:
+- per-card flags are dicts namespaced by view ("latest", "saved"), LRU-bounded by
+  UI_STATE_MAX_ITEMS and cleared in O(1) on navigation
+- loaded category feeds are kept in LRU order, at most UI_STATE_MAX_CATEGORIES of them and
+  roughly UI_STATE_MAX_MB in total; the category being viewed is never evicted
+
+A session that pages through every category stays the same size.
+"""
+from collections import OrderedDict
+
+import streamlit as st
+
+from config.settings import UI_STATE_MAX_CATEGORIES, UI_STATE_MAX_ITEMS, UI_STATE_MAX_MB
+
+ITEM_OVERHEAD_BYTES = 600  # dict + key strings per article, on top of its text
+
+
+def estimate_bytes(items):
+    """Rough in-memory size of a list of article dicts (text plus fixed per-item overhead)."""
+    return sum(
+        ITEM_OVERHEAD_BYTES + sum(len(v) for v in item.values() if isinstance(v, str))
+        for item in items
+    )
+
+
+class UIState:
+    """Per-card flags and cached category feeds for one session."""
+
+    def __init__(self, max_categories=UI_STATE_MAX_CATEGORIES, max_items=UI_STATE_MAX_ITEMS,
+                 max_mb=UI_STATE_MAX_MB):
+        self.max_categories = max_categories
+        self.max_items = max_items
+        self.max_bytes = max_mb * 1024 * 1024
+        self._flags = {}                   # namespace -> OrderedDict(item key -> flags dict)
+        self._categories = OrderedDict()   # category -> {"items": [...], "page": int}
+        self._sizes = {}                   # category -> estimated bytes
+
+    # --- Per-card flags ---
+
+    def flags(self, namespace, key):
+        """Mutable flags dict for one card (created empty). Marks the card recently used."""
+        cards = self._flags.setdefault(namespace, OrderedDict())
+        if key in cards:
+            cards.move_to_end(key)
+        else:
+            cards[key] = {}
+            while len(cards) > self.max_items:
+                cards.popitem(last=False)
+        return cards[key]
+
+    def peek_flags(self, namespace, key):
+        """A card's flags without creating or touching them ({} if it has none)."""
+        return self._flags.get(namespace, {}).get(key, {})
+
+    def clear_flags(self):
+        """Forgets every card's flags (expanded summaries, audio, in-progress work)."""
+        self._flags = {}
+
+    # --- Category feeds ---
+
+    def category(self, name):
+        """The cached {"items", "page"} entry for a category, or None."""
+        entry = self._categories.get(name)
+        if entry is not None:
+            self._categories.move_to_end(name)
+        return entry
+
+    def put_category(self, name, items, page=0):
+        """Stores a category's feed (replacing any previous one) and evicts old categories."""
+        self._categories[name] = {"items": items, "page": page}
+        self._categories.move_to_end(name)
+        self._sizes[name] = estimate_bytes(items)
+        while len(self._categories) > 1 and (
+            len(self._categories) > self.max_categories or self.memory_bytes() > self.max_bytes
+        ):
+            evicted, _ = self._categories.popitem(last=False)
+            self._sizes.pop(evicted, None)
+        return self._categories[name]
+
+    def memory_bytes(self):
+        """Estimated size of the cached feeds."""
+        return sum(self._sizes.values())
+
+
+def get_ui_state():
+    """The current session's UIState (created on first use)."""
+    if "ui" not in st.session_state:
+        st.session_state.ui = UIState()
+    return st.session_state.ui